@@ -80,6 +80,13 @@ def _setup_controller_config(config, project_path):
     config["example_path"] = str(example_path)
 
 
+def _setup_precompute_config(config):
+    # Sums are precomputed for every currency the user can select
+    controls_config = config["view"]["elements"]["root"]["controls_group"]
+    currency_config = controls_config["settings_group"]["currency"]
+    config["model"]["precompute"]["currencies"] = currency_config["options"]
+
+
 def _build_config_impl(settings, datascheme, localizations, project_path):
     config = copy.deepcopy(settings)
     datascheme = copy.deepcopy(datascheme)
@@ -87,6 +94,7 @@ def _build_config_impl(settings, datascheme, localizations, project_path):
     _setup_model_config(config["handler"]["model"], datascheme, project_path)
     _setup_view_config(config["handler"]["view"], datascheme, localizations)
     _setup_controller_config(config["handler"]["controller"], project_path)
+    _setup_precompute_config(config["handler"])
     return config
 
 
@@ -1,8 +1,37 @@
+import asyncio
 import base64
+import concurrent.futures
+import functools
 import io
+import logging
+
+import bokeh.document
 
 import app.controller.loader
 import app.exceptions
+import app.utils
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = ["seconds", "days", "weeks", "months", "quarters", "years"]
+
+
+def _choose_zoom_period(window, width, config):
+    # Raw operations once a day gets wide enough, else days while every day
+    # gets a pixel, else months
+    start_date, end_date = window
+    days_count = (end_date - start_date).total_seconds() / 86400
+    pixels_per_day = width / max(days_count, 1e-9)
+    if pixels_per_day >= config["min_pixels_per_day_for_seconds"]:
+        return "seconds"
+    elif pixels_per_day >= 1:
+        return "days"
+    else:
+        return "months"
+
+
+def _get_finer_period(period, other_period):
+    return min(period, other_period, key=_PERIODS.index)
 
 
 class RevealAppController:
@@ -11,14 +40,45 @@ class RevealAppController:
         self._model = model
         self._view = view
         self._loader = None
+        self._document = None
+        self._timeouts = {}
+        self._executor = None
+        self._tasks_versions = {}
+        self._progress_tasks_count = 0
 
     def setup(self):
         self._loader = app.controller.loader.FilesLoader()
-        self._view.setup(controller=self)
         self._model.setup()
 
     def __call__(self, document):
+        # The controller may serve one document after another. Bokeh clears
+        # models of a destroyed session, so every document gets its own view
+        # elements and its own worker, and stops only that worker when its
+        # session is gone
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="model"
+        )
+        self._document = document
+        self._executor = executor
+        self._timeouts = {}
+        self._progress_tasks_count = 0
+        self._view.setup(controller=self)
         document.add_root(self._view.representation)
+        document.on_session_destroyed(
+            functools.partial(self._on_session_destroyed, document, executor)
+        )
+
+    def _on_session_destroyed(self, document, executor, session_context):
+        del session_context
+        executor.shutdown(wait=False, cancel_futures=True)
+        if document is not self._document:
+            return
+        # The session has removed its timeouts and the document can't take
+        # callbacks anymore, so results of running tasks are dropped. No
+        # other document uses the model, so its background work stops too
+        self._document = None
+        self._timeouts.clear()
+        self._model.teardown()
 
     def on_upload_files(self, attr, old, new):
         del attr
@@ -30,33 +90,92 @@ class RevealAppController:
     def on_set_file_names(self, attr, old, new):
         del attr
         del old
-        self._view.show_loading_status_message()
-        self._loader.set_file_names(new)
-        self._init_operations(self._loader.load())
+        with self._view.hold_updates("set_file_names"):
+            self._view.show_loading_status_message()
+            self._loader.set_file_names(new)
+            self._init_operations(self._loader.load())
 
     def on_load_example_click(self):
-        self._view.show_loading_status_message()
-        path = self._config["example_path"]
-        self._loader.set_file_names([path])
-        with open(path, "rb") as file_:
-            self._loader.set_file_contents([io.BytesIO(file_.read())])
-        self._init_operations(self._loader.load())
+        with self._view.hold_updates("load_example_click"):
+            self._view.show_loading_status_message()
+            path = self._config["example_path"]
+            self._loader.set_file_names([path])
+            with open(path, "rb") as file_:
+                self._loader.set_file_contents([io.BytesIO(file_.read())])
+            self._init_operations(self._loader.load())
 
     def on_tab_change(self, attr, old, new):
         del attr
         del old
-        self._show_active_tab(new)
+        with self._view.hold_updates("tab_change"):
+            self._show_active_tab(new)
 
     def on_transactions_tab_plot_settings_change(self, attr, old, new):
         del attr
         del old
         del new
-        self._show_transactions_tab()
+        with self._view.hold_updates("transactions_tab_plot_settings_change"):
+            self._show_transactions_tab()
+
+    def on_transactions_range_change(self, attr, old, new):
+        del attr
+        del old
+        del new
+        # A zoom moves both ends of the range and panning fires continuously,
+        # so the window is shown once the range settles
+        self._debounce(
+            "transactions_zoom",
+            self._show_transactions_window,
+            self._config["transactions_zoom"]["debounce_delay"],
+        )
+
+    def on_operations_table_sort_change(self, attr, old, new):
+        del attr
+        del old
+        del new
+        with self._view.hold_updates("operations_table_sort_change"):
+            self._view.reset_operations_table_page()
+            self._show_operations_tab()
+
+    def on_operations_table_page_change(self, attr, old, new):
+        del attr
+        del old
+        del new
+        with self._view.hold_updates("operations_table_page_change"):
+            self._show_operations_tab()
 
     def on_control_change(self, attr, old, new):
         del attr
         del old
         del new
+        with self._view.hold_updates("control_change"):
+            self._view.reset_operations_table_page()
+            # Clicking through a multi select fires an event per click, only
+            # the state after the last one is reported
+            self._debounce(
+                "controls",
+                self._show_current_tab,
+                self._config["controls"]["debounce_delay"],
+            )
+
+    def _debounce(self, name, callback, delay):
+        # Pending call of the same name is dropped, so a burst of events
+        # runs the callback once, after the last event, on the latest state
+        if name in self._timeouts:
+            self._document.remove_timeout_callback(self._timeouts.pop(name))
+        if not delay:
+            callback()
+            return
+        timeouts = self._timeouts
+
+        def run():
+            del timeouts[name]
+            with self._view.hold_updates(name):
+                callback()
+
+        timeouts[name] = self._document.add_timeout_callback(run, delay)
+
+    def _show_current_tab(self):
         self._show_active_tab(self._view.get_active_tab_id())
 
     def _show_active_tab(self, tab_id):
@@ -66,39 +185,104 @@ class RevealAppController:
             self._show_operations_tab,
             self._show_help_tab,
         ]
-        callback = dispatchers[tab_id]
-        callback()
+        dispatchers[tab_id]()
 
     def _show_overview_tab(self):
-        overview = self._model.report_overview(
-            constraints=self._collect_report_constraints(),
-            settings=self._collect_report_settings(),
+        self._run_model_task(
+            "overview",
+            functools.partial(
+                self._model.report_overview,
+                constraints=self._collect_report_constraints(),
+                settings=self._collect_report_settings(),
+            ),
+            self._show_overview,
         )
+
+    def _show_overview(self, overview):
         self._view.show_overview_income_text(overview["income_total"])
         self._view.show_overview_spending_text(overview["spending_total"])
         self._view.show_overview_disposable_income_text(
             overview["disposable_income_total"]
         )
+        self._view.show_overview_currencies_totals(
+            overview["currencies_totals"]
+        )
         self._view.show_overview_income(overview["income"])
         self._view.show_overview_spending(overview["spending"])
         self._view.show_overview_cards(overview["cards"])
 
     def _show_transactions_tab(self):
-        transactions_report = self._model.report_transactions(
-            constraints=self._collect_report_constraints(),
-            settings=self._collect_report_settings(),
+        self._run_model_task(
+            "transactions",
+            functools.partial(
+                self._model.report_transactions,
+                constraints=self._collect_report_constraints(),
+                settings=self._collect_report_settings(),
+            ),
+            self._show_transactions,
         )
+
+    def _show_transactions_window(self):
+        window = self._view.get_transactions_window()
+        if window is None:
+            return
+        settings = self._collect_report_settings()
+        settings["transactions_period"] = _get_finer_period(
+            settings["transactions_period"],
+            _choose_zoom_period(
+                window,
+                self._view.get_transactions_plot_width(),
+                self._config["transactions_zoom"],
+            ),
+        )
+        # Shares the name with full refreshes, so whichever comes last wins
+        self._run_model_task(
+            "transactions",
+            functools.partial(
+                self._model.report_transactions,
+                constraints=self._collect_report_constraints(),
+                settings=settings,
+                window=window,
+            ),
+            functools.partial(self._show_transactions, keep_range=True),
+        )
+
+    def _show_transactions(self, transactions_report, keep_range=False):
         self._view.show_transactions(
             income=transactions_report["income"],
             spending=transactions_report["spending"],
+            keep_range=keep_range,
         )
 
     def _show_operations_tab(self):
-        operations = self._model.report_operations(
-            constraints=self._collect_report_constraints(),
-            settings=self._collect_report_settings(),
+        page_size = self._config["operations_page_size"]
+        self._run_model_task(
+            "operations",
+            functools.partial(
+                self._model.report_operations,
+                constraints=self._collect_report_constraints(),
+                settings=dict(
+                    self._collect_report_settings(),
+                    operations_page=self._view.get_operations_table_page(),
+                    operations_page_size=page_size,
+                    operations_sort_column=(
+                        self._view.get_operations_table_sort_column()
+                    ),
+                    operations_sort_ascending=(
+                        self._view.get_operations_table_sort_ascending()
+                    ),
+                ),
+            ),
+            functools.partial(self._show_operations, page_size=page_size),
+        )
+
+    def _show_operations(self, operations, page_size):
+        self._view.show_operations_table(
+            operations=operations["table"],
+            rows_count=operations["rows_count"],
+            page=operations["page"],
+            page_size=page_size,
         )
-        self._view.show_operations_table(operations["table"])
 
     def _show_help_tab(self):
         pass
@@ -119,23 +303,94 @@ class RevealAppController:
             "transactions_report_type": self._view.get_transactions_plot_mode(),
             "transactions_period": self._view.get_transactions_period(),
             "currency": self._view.get_currency(),
+            "overview_currencies": (
+                self._view.get_currencies()
+                if self._config["show_currencies_totals"]
+                else None
+            ),
         }
 
     def _init_operations(self, files):
         self._view.show_loading_exchange_rates_status_message()
-        try:
-            self._model.init_operations(files)
-        except (
-            app.exceptions.ReadOperationsError,
-            app.exceptions.ConvertOperationsError,
-        ) as error:
-            self._view.show_status_message(error.message)
-            raise error
-        else:
-            constraints = None
-            settings = self._collect_report_settings()
-            self._view.update_controls_values(
-                self._model.report_operations_stats(constraints, settings)
-            )
-            self._view.show_load_successful_status_message()
-            self._show_active_tab(self._view.get_active_tab_id())
+        self._run_model_task(
+            "init_operations",
+            functools.partial(
+                self._load_operations,
+                files,
+                settings=self._collect_report_settings(),
+            ),
+            self._show_loaded_operations,
+            # Loading has its own status messages
+            show_progress=False,
+        )
+
+    def _load_operations(self, files, settings):
+        self._model.init_operations(files)
+        return self._model.report_operations_stats(None, settings)
+
+    def _show_loaded_operations(self, operations_stats):
+        self._view.update_controls_values(operations_stats)
+        self._view.show_load_successful_status_message()
+        self._show_current_tab()
+
+    def _run_model_task(self, name, work, show, show_progress=True):
+        # Model work runs in the worker thread without the document lock, so
+        # this and other sessions keep serving events meanwhile. Results are
+        # shown under the lock unless a later task of the same name replaced
+        # the task. The worker is single threaded, so the model is never
+        # used from two threads at once
+        version = self._tasks_versions.get(name, 0) + 1
+        self._tasks_versions[name] = version
+
+        def run_work():
+            with app.utils.trace_peak_memory(name):
+                return work()
+
+        def finish(get_result):
+            if self._tasks_versions[name] != version:
+                logger.debug(f"Dropped result of superseded {name} task")
+                return
+            try:
+                result = get_result()
+            except app.exceptions.RevealAppError as error:
+                logger.exception(f"Task {name} has failed")
+                self._view.show_status_message(error.message)
+                return
+            show(result)
+
+        if not self._config["model_worker"]["enabled"]:
+            finish(run_work)
+            return
+
+        document = self._document
+        executor = self._executor
+
+        @bokeh.document.without_document_lock
+        async def run_unlocked():
+            future = executor.submit(run_work)
+            # Errors of the work are raised when its result is taken
+            await asyncio.wait([asyncio.wrap_future(future)])
+            if self._document is document:
+                document.add_next_tick_callback(
+                    functools.partial(finish_locked, future)
+                )
+
+        def finish_locked(future):
+            with self._view.hold_updates(name):
+                if show_progress:
+                    self._end_progress()
+                finish(future.result)
+
+        if show_progress:
+            self._begin_progress()
+        document.add_next_tick_callback(run_unlocked)
+
+    def _begin_progress(self):
+        if self._progress_tasks_count == 0:
+            self._view.show_progress_status_message()
+        self._progress_tasks_count += 1
+
+    def _end_progress(self):
+        self._progress_tasks_count -= 1
+        if self._progress_tasks_count == 0:
+            self._view.hide_progress_status_message()
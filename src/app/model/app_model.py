@@ -1,26 +1,66 @@
+import numpy
+
 import app.exceptions
+import app.model.cache
 import app.model.convert
+import app.model.duckdb_report
+import app.model.precompute
 import app.model.read
 import app.model.report
 
 
+def _build_reporter(config):
+    backend = config["backend"]
+    if backend == "pandas":
+        return app.model.report.PandasOperationsReporter(config)
+    elif backend == "duckdb":
+        return app.model.duckdb_report.DuckdbOperationsReporter(config)
+    else:
+        raise RuntimeError(f"Unknown report backend {backend}")
+
+
+def _take_dates_window(operations, window):
+    # Operations are sorted by date. One row on each side of the window is
+    # kept, so lines run up to the window edges
+    if operations is None or operations.empty:
+        return operations
+    start_date, end_date = window
+    dates = operations["operation_date"].to_numpy()
+    begin = dates.searchsorted(numpy.datetime64(start_date), side="left")
+    end = dates.searchsorted(numpy.datetime64(end_date), side="right")
+    return operations.iloc[max(begin - 1, 0) : min(end + 1, len(dates))]
+
+
 class RevealAppModel:
     def __init__(self, config):
         self._config = config
         self._operations = None
+        self._operations_version = 0
+        self._partial_sums = {}
         self._reader = None
         self._converter = None
         self._reporter = None
+        self._reports_cache = None
+        self._precomputer = None
 
     def setup(self):
         self._reader = app.model.read.OperationsReader(self._config["read"])
         self._converter = app.model.convert.OperationsConverter(
             self._config["convert"]
         )
-        self._reporter = app.model.report.OperationsReporter(
-            self._config["report"]
+        self._reporter = _build_reporter(self._config["report"])
+        self._reports_cache = app.model.cache.ReportsCache(
+            self._config["cache"]
+        )
+        # The worker gets its own converter, so rates are read from its thread
+        self._precomputer = app.model.precompute.CurrenciesPrecomputer(
+            self._config["precompute"],
+            app.model.convert.OperationsConverter(self._config["convert"]),
         )
 
+    def teardown(self):
+        self._precomputer.cancel()
+
     def report_overview(self, constraints, settings):
         report = {
             "income_total": 0,
@@ -29,38 +69,50 @@ class RevealAppModel:
             "income": None,
             "spending": None,
             "cards": None,
+            "currencies_totals": None,
         }
         if self._operations is not None:
-            report = self._reporter.report_overview(
-                self._operations, constraints, settings
+            report = self._report(
+                self._reporter.report_overview,
+                constraints,
+                settings,
+                overview_currencies=settings["overview_currencies"] or [],
             )
         return report
 
-    def report_transactions(self, constraints, settings):
+    def report_transactions(self, constraints, settings, window=None):
         report = {
             "income": None,
             "spending": None,
         }
         if self._operations is not None:
-            report = self._reporter.report_transactions(
-                self._operations, constraints, settings
+            # Windows are cut from the cached full report, so cumulative sums
+            # keep their offsets and panning does not rebuild the report
+            report = self._report(
+                self._reporter.report_transactions, constraints, settings
             )
+            if window is not None:
+                report = {
+                    name: _take_dates_window(operations, window)
+                    for name, operations in report.items()
+                }
         return report
 
     def report_operations(self, constraints, settings):
-        report = {"table": None}
+        report = {"table": None, "rows_count": 0, "page": 0}
         if self._operations is not None:
-            self._convert_operations(settings["currency"])
-            report = self._reporter.report_operations(
-                self._operations, constraints, settings
+            report = self._report(
+                self._reporter.report_operations, constraints, settings
             )
         return report
 
     def report_operations_stats(self, constraints, settings):
         assert self._operations is not None
-        self._convert_operations(settings["currency"])
-        return self._reporter.report_operations_stats(
-            self._operations, constraints, settings
+        return self._report(
+            self._reporter.report_operations_stats,
+            constraints,
+            settings,
+            needs_sums=False,
         )
 
     def init_operations(self, files):
@@ -70,21 +122,77 @@ class RevealAppModel:
             message = "Failed to read operations"
             raise app.exceptions.ReadOperationsError(message) from error
         self._operations = operations
+        self._operations_version += 1
+        self._partial_sums.clear()
+        self._reporter.load(operations)
+        self._reports_cache.clear()
+        self._precomputer.start(self._operations_version, operations)
+
+    def _report(
+        self,
+        reporter_method,
+        constraints,
+        settings,
+        needs_sums=True,
+        overview_currencies=(),
+    ):
+        def make_report():
+            for currency in overview_currencies:
+                self._operations[f"overview_sum_{currency}"] = (
+                    self._convert_operations(currency, constraints)
+                )
+            if needs_sums:
+                self._operations["operation_sum"] = self._convert_operations(
+                    settings["currency"], constraints
+                )
+            return reporter_method(self._operations, constraints, settings)
+
+        return self._reports_cache.get(
+            name=reporter_method.__name__,
+            version=self._operations_version,
+            constraints=constraints,
+            settings=settings,
+            make_report=make_report,
+        )
 
     def _read_operations(self, files):
         return self._reader.read(files)
 
-    def _convert_operations(self, currency):
+    def _convert_operations(self, currency, constraints):
+        # Only the rows selected by the constraints are converted. Converted
+        # sums are kept, so widening the constraints converts only the new
+        # rows, and become a column once every row is converted
         column_name = f"operation_sum_{currency}"
-        if column_name not in self._operations:
+        precomputed_sums = self._precomputer.take(
+            self._operations_version, currency
+        )
+        is_precomputed = precomputed_sums is not None
+        if is_precomputed and column_name not in self._operations:
+            self._partial_sums.pop(currency, None)
+            self._operations[column_name] = precomputed_sums
+        if column_name in self._operations:
+            return self._operations[column_name].to_numpy()
+        if currency not in self._partial_sums:
+            self._partial_sums[currency] = (
+                numpy.full(len(self._operations), numpy.nan),
+                numpy.zeros(len(self._operations), dtype=bool),
+            )
+        sums, converted = self._partial_sums[currency]
+        rows = self._reporter.select_rows(self._operations, constraints)
+        rows = rows[~converted[rows]]
+        if len(rows) > 0:
             try:
-                self._operations[column_name] = self._converter.convert(
-                    self._operations["operation_date"],
-                    self._operations["operation_currency"],
-                    self._operations["operation_total"],
+                sums[rows] = self._converter.convert(
+                    self._operations["operation_date"].iloc[rows],
+                    self._operations["operation_currency"].iloc[rows],
+                    self._operations["operation_total"].iloc[rows],
                     currency,
                 )
             except Exception as error:
                 message = f"Failed to convert to {currency}"
                 raise app.exceptions.ConvertOperationsError(message) from error
-        self._operations["operation_sum"] = self._operations[column_name]
+            converted[rows] = True
+        if converted.all():
+            del self._partial_sums[currency]
+            self._operations[column_name] = sums
+        return sums
@@ -0,0 +1,130 @@
+import collections
+import logging
+import sys
+
+import pandas
+
+logger = logging.getLogger(__name__)
+
+
+def _estimate_column_size(column):
+    size = column.memory_usage(index=False, deep=False)
+    if column.dtype == object or pandas.api.types.is_string_dtype(column):
+        # Deep size of every string is too slow for large frames
+        step = max(1, len(column) // 100)
+        sample = column.iloc[::step]
+        if len(sample) > 0:
+            average = sum(sys.getsizeof(value) for value in sample) / len(
+                sample
+            )
+            size += int(average * len(column))
+    return size
+
+
+def _estimate_size(value):
+    if isinstance(value, pandas.DataFrame):
+        return value.index.memory_usage() + sum(
+            _estimate_column_size(value[column_name])
+            for column_name in value.columns
+        )
+    elif isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(item) for item in value.values()
+        )
+    elif isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(item) for item in value
+        )
+    return sys.getsizeof(value)
+
+
+def _copy_report(report):
+    # Shallow copies let the caller sort and add columns in place without
+    # touching the cached frames
+    return {
+        name: (
+            value.copy(deep=False)
+            if isinstance(value, pandas.DataFrame)
+            else value
+        )
+        for name, value in report.items()
+    }
+
+
+def _normalize_constraints(constraints):
+    if constraints is None:
+        return None
+    return tuple(
+        tuple(
+            (
+                name,
+                (
+                    tuple(value)
+                    if name == "date_range"
+                    else (None if value is None else frozenset(value))
+                ),
+            )
+            for name, value in sorted(constraint.items())
+        )
+        for constraint in constraints
+    )
+
+
+def _normalize_settings(settings):
+    return tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in sorted(settings.items())
+    )
+
+
+class ReportsCache:
+    def __init__(self, config):
+        self._config = config
+        self._reports = collections.OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def clear(self):
+        self._reports.clear()
+        self._size = 0
+
+    def get(self, name, version, constraints, settings, make_report):
+        key = (
+            name,
+            version,
+            _normalize_constraints(constraints),
+            _normalize_settings(settings),
+        )
+        if key in self._reports:
+            self._hits += 1
+            self._reports.move_to_end(key)
+            report, _ = self._reports[key]
+        else:
+            self._misses += 1
+            report = make_report()
+            self._put(key, report)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Reports cache stats: {self.get_stats()}")
+        return _copy_report(report)
+
+    def get_stats(self):
+        requests_count = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / requests_count if requests_count else 0,
+            "reports_count": len(self._reports),
+            "size": self._size,
+        }
+
+    def _put(self, key, report):
+        size = _estimate_size(report)
+        max_size = self._config["max_size"]
+        if size > max_size:
+            return
+        self._reports[key] = (report, size)
+        self._size += size
+        while self._size > max_size:
+            _, (_, evicted_size) = self._reports.popitem(last=False)
+            self._size -= evicted_size
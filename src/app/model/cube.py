@@ -0,0 +1,122 @@
+import numpy
+import pandas
+
+import app.model.index
+
+
+class OperationsCube:
+    # Operation sums rolled up by day, category, card, data file and sign.
+    # A cell covers rows with dates in [day, day_ceil], which is enough to
+    # answer date ranges bounded by midnights the same way as the raw rows.
+    # Descriptions are not a dimension, so only constraints that keep every
+    # description (or none of them) can be answered by the cube
+    DIMENSIONS = [
+        "day",
+        "day_ceil",
+        "category",
+        "card_number",
+        "data_file",
+        "is_income",
+    ]
+
+    def __init__(self, operations, sums):
+        dates = operations["operation_date"]
+        rows = pandas.DataFrame(
+            {
+                "day": dates.dt.floor("D"),
+                "day_ceil": dates.dt.ceil("D"),
+                "category": operations["category"],
+                "card_number": operations["card_number"],
+                "data_file": operations["data_file"],
+                "is_income": sums >= 0,
+                "operation_sum": sums,
+                "first_row": numpy.arange(len(operations)),
+            }
+        )
+        cells = rows.groupby(self.DIMENSIONS, sort=False, dropna=False).agg(
+            {"operation_sum": "sum", "first_row": "min"}
+        )
+        cells.reset_index(inplace=True)
+        # Cells go in order of their first row, so they are sorted by day too
+        cells.sort_values(by="first_row", inplace=True)
+        cells.reset_index(drop=True, inplace=True)
+        self._cells = cells
+        self._periods_index = app.model.index.PeriodsIndex(cells["day"])
+        self._descriptions = set(operations["description"].unique())
+        self._indexes = {
+            column_name: app.model.index.ColumnIndex(cells[column_name])
+            for column_name in ["data_file", "card_number", "category"]
+        }
+
+    def __len__(self):
+        return len(self._cells)
+
+    def covers(self, constraints):
+        if constraints is None:
+            return True
+        for constraint in constraints:
+            if not self._covers_date_range(constraint["date_range"]):
+                return False
+            descriptions = constraint["descriptions"]
+            if descriptions is not None and not self._descriptions.issubset(
+                descriptions
+            ):
+                return False
+        return True
+
+    def make_mask(self, constraints):
+        if constraints is None:
+            return numpy.ones(len(self._cells), dtype=bool)
+        mask = numpy.zeros(len(self._cells), dtype=bool)
+        for constraint in constraints:
+            mask |= self._make_constraint_mask(constraint)
+        return mask
+
+    def get_income_rows(self, mask):
+        return numpy.flatnonzero(mask & self._cells["is_income"].to_numpy())
+
+    def get_spending_rows(self, mask):
+        return numpy.flatnonzero(mask & ~self._cells["is_income"].to_numpy())
+
+    def get_buckets(self, period, rows):
+        return self._periods_index.get_codes(period, rows)
+
+    def get_index(self, column_name):
+        return self._indexes[column_name]
+
+    def get_sums(self, rows):
+        return self._cells["operation_sum"].to_numpy()[rows]
+
+    def _make_constraint_mask(self, constraint):
+        column_names = ["data_file", "card_number", "category"]
+        value_names = ["data_files", "card_numbers", "categories"]
+        if constraint["descriptions"] is None:
+            return numpy.zeros(len(self._cells), dtype=bool)
+        mask = self._make_dates_mask(constraint["date_range"])
+        for column_name, value_name in zip(column_names, value_names):
+            values = constraint[value_name]
+            if values is None:
+                return numpy.zeros(len(self._cells), dtype=bool)
+            mask &= self._indexes[column_name].make_mask(values)
+        return mask
+
+    def _make_dates_mask(self, date_range):
+        start_date, end_date = date_range
+        mask = numpy.ones(len(self._cells), dtype=bool)
+        if start_date is not None:
+            mask &= (
+                self._cells["day"] >= pandas.Timestamp(start_date)
+            ).to_numpy()
+        if end_date is not None:
+            mask &= (
+                self._cells["day_ceil"] <= pandas.Timestamp(end_date)
+            ).to_numpy()
+        return mask
+
+    @classmethod
+    def _covers_date_range(cls, date_range):
+        return all(
+            date is None
+            or pandas.Timestamp(date) == pandas.Timestamp(date).floor("D")
+            for date in date_range
+        )
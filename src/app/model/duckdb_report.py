@@ -0,0 +1,407 @@
+import datetime
+
+import numpy
+import pandas
+
+import app.model.index
+import app.model.report
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+_COLUMN_NAMES = [
+    "operation_date",
+    "card_number",
+    "category",
+    "description",
+    "data_file",
+]
+
+_DAYS = "datediff('day', DATE '1970-01-01', CAST(operation_date AS DATE))"
+_NEXT_DAYS = "CAST(operation_date AS DATE) + 1"
+
+# Same bucket codes as in app.model.index.PeriodsIndex
+_PERIOD_CODES = {
+    "days": _DAYS,
+    "weeks": f"CAST(floor(({_DAYS} + 3) / 7) AS BIGINT)",
+    "months": (f"(year({_NEXT_DAYS}) - 1970) * 12 + month({_NEXT_DAYS}) - 1"),
+    "quarters": (
+        "CAST(floor(((year(operation_date) - 1970) * 12 "
+        "+ month(operation_date) - 1) / 3) AS BIGINT)"
+    ),
+    "years": "year(operation_date) - 1970",
+}
+
+
+def _make_condition(constraints):
+    column_names = ["data_file", "card_number", "category", "description"]
+    value_names = ["data_files", "card_numbers", "categories", "descriptions"]
+    if constraints is None:
+        return "TRUE", []
+    clauses, parameters = [], []
+    for constraint in constraints:
+        predicates = ["TRUE"]
+        start_date, end_date = constraint["date_range"]
+        if start_date is not None:
+            predicates.append("o.operation_date >= ?")
+            parameters.append(pandas.Timestamp(start_date).to_pydatetime())
+        if end_date is not None:
+            predicates.append("o.operation_date <= ?")
+            parameters.append(pandas.Timestamp(end_date).to_pydatetime())
+        for column_name, value_name in zip(column_names, value_names):
+            values = constraint[value_name]
+            if values is None:
+                predicates.append("FALSE")
+            else:
+                predicates.append(
+                    f"o.{column_name} IN "
+                    "(SELECT unnest(CAST(? AS VARCHAR[])))"
+                )
+                parameters.append([str(value) for value in values])
+        clauses.append("(" + " AND ".join(predicates) + ")")
+    return " OR ".join(clauses) or "FALSE", parameters
+
+
+def _make_side_condition(side):
+    if side == "income":
+        return "operation_sum >= 0"
+    elif side == "spending":
+        return "operation_sum < 0"
+    else:
+        raise RuntimeError(f"Unknown side {side}")
+
+
+def _make_sum(side):
+    return "operation_sum" if side == "income" else "-operation_sum"
+
+
+def _accumulate_operation_sum(sums, accumulation_type):
+    if accumulation_type == "cumulative":
+        return numpy.cumsum(sums)
+    elif accumulation_type == "incremental":
+        return sums
+    else:
+        raise RuntimeError("Unknown transctions_report_type")
+
+
+class DuckdbOperationsReporter(app.model.report.OperationsReporterBackend):
+    # Operations are copied into an in-process DuckDB table once on load and
+    # every report is a SQL query over it, which DuckDB runs in parallel.
+    # Sums change with the currency, so they are joined to the table by
+    # position on every query without copying
+    def __init__(self, config):
+        if duckdb is None:
+            raise RuntimeError("duckdb package is required by duckdb backend")
+        self._config = config
+        self._connection = None
+
+    def load(self, operations):
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = duckdb.connect()
+        threads_count = self._config["max_duckdb_threads_count"]
+        if threads_count is not None:
+            self._connection.execute(f"SET threads TO {int(threads_count)};")
+        self._connection.register("loaded", operations[_COLUMN_NAMES])
+        self._connection.execute(
+            "CREATE TABLE operations AS SELECT * FROM loaded;"
+        )
+        self._connection.unregister("loaded")
+
+    def select_rows(self, operations, constraints):
+        rows = self._query(
+            operations,
+            constraints,
+            "SELECT row_id FROM selected ORDER BY row_id;",
+            sums_column_names=(),
+        )
+        return rows["row_id"].to_numpy()
+
+    def report_operations(self, operations, constraints, settings):
+        return app.model.report.get_operations_page(
+            operations, self.select_rows(operations, constraints), settings
+        )
+
+    def report_transactions(self, operations, constraints, settings):
+        return {
+            side: self._report_transactions_side(
+                operations, constraints, settings, side
+            )
+            for side in ["income", "spending"]
+        }
+
+    def report_overview(self, operations, constraints, settings):
+        currencies = settings["overview_currencies"]
+        income = self._report_categories(operations, constraints, "income")
+        spending = self._report_categories(operations, constraints, "spending")
+        cards = self._query(
+            operations,
+            constraints,
+            "SELECT card_number, "
+            "sum(CASE WHEN operation_sum >= 0 THEN operation_sum ELSE 0 END) "
+            "AS income, "
+            "sum(CASE WHEN operation_sum < 0 THEN -operation_sum ELSE 0 END) "
+            "AS spending "
+            "FROM selected GROUP BY card_number ORDER BY card_number;",
+        )
+        income_total = income["operation_sum"].sum()
+        spending_total = spending["operation_sum"].sum()
+        return {
+            "income_total": income_total,
+            "spending_total": spending_total,
+            "disposable_income_total": income_total - spending_total,
+            "income": income,
+            "spending": spending,
+            "cards": cards,
+            "currencies_totals": (
+                self._report_currencies_totals(
+                    operations, constraints, currencies
+                )
+                if currencies
+                else None
+            ),
+        }
+
+    def report_operations_stats(self, operations, constraints, settings):
+        del settings
+        report_names = {
+            "data_files": "data_file",
+            "categories": "category",
+            "descriptions": "description",
+            "card_numbers": "card_number",
+        }
+        dates = self._query(
+            operations,
+            constraints,
+            "SELECT min(operation_date) AS start_date, "
+            "max(operation_date) AS end_date FROM selected;",
+            sums_column_names=(),
+        )
+        date_range = (None, None)
+        if not pandas.isnull(dates["start_date"].iloc[0]):
+            start_date = dates["start_date"].iloc[0].date()
+            end_date = dates["end_date"].iloc[0].date()
+            date_range = (
+                start_date - datetime.timedelta(days=1),
+                end_date + datetime.timedelta(days=1),
+            )
+        # Values go in order of their first appearance
+        values = self._query(
+            operations,
+            constraints,
+            " UNION ALL ".join(
+                f"SELECT '{column_name}' AS column_name, "
+                f"{column_name} AS value, min(row_id) AS first_row, "
+                f"count(*) AS operations_count "
+                f"FROM selected GROUP BY {column_name}"
+                for column_name in report_names.values()
+            )
+            + " ORDER BY first_row;",
+            sums_column_names=(),
+        )
+        report = {"date_range": date_range}
+        for report_name, column_name in report_names.items():
+            is_column = values["column_name"] == column_name
+            report[report_name] = list(values["value"][is_column])
+            report[f"{report_name}_counts"] = values["operations_count"][
+                is_column
+            ].tolist()
+        return report
+
+    def _report_currencies_totals(self, operations, constraints, currencies):
+        # Rates keep the signs of the sums, so income rows are the same in
+        # every currency
+        column_names = [f"overview_sum_{currency}" for currency in currencies]
+        sign_column_name = column_names[0]
+        totals = self._query(
+            operations,
+            constraints,
+            "SELECT "
+            + ", ".join(
+                f"sum(CASE WHEN {sign_column_name} >= 0 THEN {column_name} "
+                f"ELSE 0 END) AS income_{index}, "
+                f"sum(CASE WHEN {sign_column_name} < 0 THEN -{column_name} "
+                f"ELSE 0 END) AS spending_{index}"
+                for index, column_name in enumerate(column_names)
+            )
+            + " FROM selected;",
+            sums_column_names=column_names,
+        )
+        # Sums over no rows are NULL
+        totals = totals.iloc[0].fillna(0)
+        income_totals = totals[
+            [f"income_{index}" for index in range(len(currencies))]
+        ].to_numpy(dtype=float)
+        spending_totals = totals[
+            [f"spending_{index}" for index in range(len(currencies))]
+        ].to_numpy(dtype=float)
+        return pandas.DataFrame(
+            {
+                "currency": currencies,
+                "income_total": income_totals,
+                "spending_total": spending_totals,
+                "disposable_income_total": income_totals - spending_totals,
+            }
+        )
+
+    def _report_categories(self, operations, constraints, side):
+        # Categories beyond the top ones are folded into the remainder
+        return self._query(
+            operations,
+            constraints,
+            "SELECT CASE WHEN rank <= ? THEN category ELSE ? END "
+            "AS category, sum(operation_sum) AS operation_sum "
+            "FROM ("
+            "SELECT category, operation_sum, row_number() OVER "
+            "(ORDER BY operation_sum DESC, first_row) AS rank "
+            "FROM ("
+            f"SELECT category, sum({_make_sum(side)}) AS operation_sum, "
+            "min(row_id) AS first_row FROM selected "
+            f"WHERE {_make_side_condition(side)} GROUP BY category"
+            ")) GROUP BY 1 ORDER BY operation_sum DESC;",
+            [self._config["max_overview_categories_count"], "Ocтальное"],
+        )
+
+    def _report_transactions_side(
+        self, operations, constraints, settings, side
+    ):
+        period = settings["transactions_period"]
+        accumulation_type = settings["transactions_report_type"]
+        if period == "seconds":
+            view = self._query(
+                operations,
+                constraints,
+                f"SELECT operation_date, {_make_sum(side)} AS operation_sum, "
+                "data_file, category, description FROM selected "
+                f"WHERE {_make_side_condition(side)} ORDER BY row_id;",
+            )
+            view["operation_sum"] = _accumulate_operation_sum(
+                view["operation_sum"].to_numpy(), accumulation_type
+            )
+            return view
+        elif period not in _PERIOD_CODES:
+            raise RuntimeError(f"Unknown period {period}")
+        buckets = (
+            f"SELECT {_PERIOD_CODES[period]} AS bucket, row_id, "
+            f"{_make_sum(side)} AS operation_sum, "
+            "data_file, category, description FROM selected "
+            f"WHERE {_make_side_condition(side)}"
+        )
+        sums = self._query(
+            operations,
+            constraints,
+            "SELECT bucket, sum(operation_sum) AS operation_sum "
+            f"FROM ({buckets}) GROUP BY bucket;",
+        )
+        view = pandas.DataFrame(
+            {"operation_date": pandas.DatetimeIndex([]), "operation_sum": []}
+        )
+        first_bucket, buckets_count = 0, 0
+        if not sums.empty:
+            first_bucket = sums["bucket"].min()
+            buckets_count = sums["bucket"].max() - first_bucket + 1
+            bucket_sums = numpy.zeros(buckets_count)
+            bucket_sums[sums["bucket"].to_numpy() - first_bucket] = sums[
+                "operation_sum"
+            ].to_numpy()
+            view = pandas.DataFrame(
+                {
+                    "operation_date": app.model.index.PeriodsIndex.decode(
+                        period,
+                        numpy.arange(
+                            first_bucket, first_bucket + buckets_count
+                        ),
+                    ),
+                    "operation_sum": _accumulate_operation_sum(
+                        bucket_sums, accumulation_type
+                    ),
+                }
+            )
+        max_buckets_count = self._config["max_digest_buckets_count"]
+        skip_digests = buckets_count == 0 or (
+            max_buckets_count is not None and buckets_count > max_buckets_count
+        )
+        digests = None
+        if not skip_digests:
+            digests = self._query(
+                operations,
+                constraints,
+                self._make_digests_query(),
+                ctes={"buckets": buckets},
+            )
+        for column_name in ["data_file", "category", "description"]:
+            column_digests = numpy.full(buckets_count, "", dtype=object)
+            if digests is not None:
+                selected = digests[digests["column_name"] == column_name]
+                positions = selected["bucket"].to_numpy() - first_bucket
+                column_digests[positions] = selected["digest"].to_numpy()
+            view[column_name] = column_digests
+        return view
+
+    def _make_digests_query(self):
+        # Same as ",".join(values.unique()) per bucket over the rows in order
+        firsts = " UNION ALL ".join(
+            f"SELECT '{column_name}' AS column_name, bucket, "
+            f"{column_name} AS value, min(row_id) AS first_row "
+            f"FROM buckets GROUP BY bucket, {column_name}"
+            for column_name in ["data_file", "category", "description"]
+        )
+        ranks = ""
+        max_values_count = self._config["max_digest_values_count"]
+        if max_values_count is not None:
+            ranks = (
+                "QUALIFY row_number() OVER "
+                "(PARTITION BY column_name, bucket ORDER BY first_row) "
+                f"<= {int(max_values_count)}"
+            )
+        return (
+            "SELECT column_name, bucket, "
+            "string_agg(value, ',' ORDER BY first_row) AS digest "
+            f"FROM (SELECT * FROM ({firsts}) {ranks}) "
+            "GROUP BY column_name, bucket;"
+        )
+
+    def _query(
+        self,
+        operations,
+        constraints,
+        query,
+        parameters=None,
+        ctes=None,
+        sums_column_names=("operation_sum",),
+    ):
+        # Queries select from the rows matching the constraints, named
+        # selected, and from the extra common table expressions
+        condition, condition_parameters = _make_condition(constraints)
+        ctes = "".join(
+            f", {name} AS ({cte})" for name, cte in (ctes or {}).items()
+        )
+        sums_columns, sums_join = "", ""
+        if sums_column_names:
+            self._connection.register(
+                "sums",
+                pandas.DataFrame(
+                    {
+                        column_name: operations[column_name].to_numpy()
+                        for column_name in sums_column_names
+                    }
+                ),
+            )
+            sums_columns = "".join(
+                f", s.{column_name}" for column_name in sums_column_names
+            )
+            sums_join = " POSITIONAL JOIN sums AS s"
+        try:
+            return self._connection.execute(
+                "WITH selected AS ("
+                "SELECT o.rowid AS row_id, o.operation_date, o.card_number, "
+                f"o.category, o.description, o.data_file{sums_columns} "
+                f"FROM operations AS o{sums_join} "
+                f"WHERE {condition}){ctes} " + query,
+                condition_parameters + (parameters or []),
+            ).df()
+        finally:
+            if sums_column_names:
+                self._connection.unregister("sums")
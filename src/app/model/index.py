@@ -0,0 +1,133 @@
+import numpy
+import pandas
+
+
+class ColumnIndex:
+    # Rows of the column grouped by value: rows of the value with code c are
+    # self._rows[self._offsets[c]:self._offsets[c + 1]]. Code 0 is reserved
+    # for missing values, so known values are coded starting from 1
+    SCATTER_ROWS_RATIO = 16
+    SCATTER_VALUES_COUNT = 256
+
+    def __init__(self, values):
+        codes, uniques = pandas.factorize(values)
+        self._codes = codes + 1
+        self._values = pandas.Index(uniques)
+        self._rows = numpy.argsort(self._codes, kind="stable")
+        self._counts = numpy.bincount(
+            self._codes, minlength=len(self._values) + 1
+        )
+        self._offsets = numpy.concatenate([[0], numpy.cumsum(self._counts)])
+
+    def __len__(self):
+        return len(self._codes)
+
+    def make_mask(self, values):
+        codes = self._get_codes(values)
+        selected_count = self._counts[codes].sum()
+        rows_count = len(self._codes)
+        is_sparse = selected_count * self.SCATTER_ROWS_RATIO <= rows_count
+        if is_sparse and len(codes) <= self.SCATTER_VALUES_COUNT:
+            mask = numpy.zeros(rows_count, dtype=bool)
+            for code in codes:
+                begin, end = self._offsets[code], self._offsets[code + 1]
+                mask[self._rows[begin:end]] = True
+            return mask
+        selected = numpy.zeros(len(self._values) + 1, dtype=bool)
+        selected[codes] = True
+        return selected[self._codes]
+
+    def get_unique_values(self, mask=None):
+        # Values go in order of their first appearance like in Series.unique
+        codes = self._codes if mask is None else self._codes[mask]
+        unique_codes, first_rows = numpy.unique(codes, return_index=True)
+        unique_codes = unique_codes[numpy.argsort(first_rows)]
+        unique_codes = unique_codes[unique_codes > 0]
+        return list(self._values[unique_codes - 1])
+
+    def count_values(self, mask=None):
+        codes = self._codes if mask is None else self._codes[mask]
+        counts = numpy.bincount(codes, minlength=len(self._values) + 1)
+        return pandas.Series(counts[1:], index=self._values)
+
+    def get_codes_count(self):
+        return len(self._values) + 1
+
+    def get_codes(self, rows):
+        return self._codes[rows]
+
+    def decode(self, codes):
+        return numpy.asarray(self._values, dtype=object)[codes - 1]
+
+    def _get_codes(self, values):
+        codes = self._values.get_indexer(pandas.Index(values).unique())
+        return codes[codes >= 0] + 1
+
+
+class DatesIndex:
+    # Dates must be sorted, so a date range maps onto a contiguous slice of
+    # rows
+    def __init__(self, dates):
+        assert dates.is_monotonic_increasing
+        self._dates = dates.to_numpy()
+
+    def make_slice(self, date_range):
+        start_date, end_date = date_range
+        begin, end = 0, len(self._dates)
+        if start_date is not None:
+            begin = self._dates.searchsorted(
+                pandas.Timestamp(start_date).to_datetime64(), side="left"
+            )
+        if end_date is not None:
+            end = self._dates.searchsorted(
+                pandas.Timestamp(end_date).to_datetime64(), side="right"
+            )
+        return slice(begin, max(begin, end))
+
+    def make_mask(self, date_range):
+        mask = numpy.zeros(len(self._dates), dtype=bool)
+        mask[self.make_slice(date_range)] = True
+        return mask
+
+
+class PeriodsIndex:
+    # Dates coded by the period buckets they fall into. Codes of consecutive
+    # buckets are consecutive integers, so series over buckets are bincounts.
+    # Months are labelled by the last month end on or before the date like
+    # the "M" resample rule, other periods by the first date of the bucket
+    PERIODS = ["days", "weeks", "months", "quarters", "years"]
+
+    def __init__(self, dates):
+        days = dates.to_numpy().astype("datetime64[D]")
+        day_codes = days.astype(numpy.int64)
+        months = days.astype("datetime64[M]").astype(numpy.int64)
+        self._codes = {
+            "days": day_codes,
+            # 1970-01-01 is a Thursday, so ISO weeks start 3 days earlier
+            "weeks": (day_codes + 3) // 7,
+            "months": (days + 1).astype("datetime64[M]").astype(numpy.int64),
+            "quarters": months // 3,
+            "years": days.astype("datetime64[Y]").astype(numpy.int64),
+        }
+        for period, codes in self._codes.items():
+            self._codes[period] = codes.astype(numpy.int32)
+
+    def get_codes(self, period, rows):
+        return self._codes[period][rows]
+
+    @classmethod
+    def decode(cls, period, codes):
+        codes = codes.astype(numpy.int64)
+        if period == "days":
+            days = codes.astype("datetime64[D]")
+        elif period == "weeks":
+            days = (codes * 7 - 3).astype("datetime64[D]")
+        elif period == "months":
+            days = codes.astype("datetime64[M]").astype("datetime64[D]") - 1
+        elif period == "quarters":
+            days = (codes * 3).astype("datetime64[M]").astype("datetime64[D]")
+        elif period == "years":
+            days = codes.astype("datetime64[Y]").astype("datetime64[D]")
+        else:
+            raise RuntimeError(f"Unknown period {period}")
+        return pandas.DatetimeIndex(days.astype("datetime64[ns]"))
@@ -0,0 +1,92 @@
+import logging
+import threading
+
+import numpy
+
+logger = logging.getLogger(__name__)
+
+
+class _PrecomputeJob:
+    def __init__(self, version, dates, currencies, totals):
+        self.version = version
+        self.dates = dates
+        self.currencies = currencies
+        self.totals = totals
+        self.cancelled = threading.Event()
+
+
+class CurrenciesPrecomputer:
+    # Converts operations into every configured currency in a worker thread.
+    # The worker never touches the operations frame: a currency is published
+    # only once all its sums are ready, and the model takes them over from
+    # its own thread. Replacing the operations cancels the running job
+    def __init__(self, config, converter):
+        self._config = config
+        self._converter = converter
+        self._lock = threading.Lock()
+        self._job = None
+        self._sums = {}
+
+    def start(self, version, operations):
+        self.cancel()
+        if not self._config["enabled"]:
+            return
+        job = _PrecomputeJob(
+            version=version,
+            dates=operations["operation_date"],
+            currencies=operations["operation_currency"],
+            totals=operations["operation_total"],
+        )
+        with self._lock:
+            self._job = job
+        thread = threading.Thread(
+            target=self._run, args=(job,), name="precompute", daemon=True
+        )
+        thread.start()
+
+    def cancel(self):
+        with self._lock:
+            if self._job is not None:
+                self._job.cancelled.set()
+            self._job = None
+            self._sums.clear()
+
+    def take(self, version, currency):
+        with self._lock:
+            return self._sums.pop((version, currency), None)
+
+    def _run(self, job):
+        for currency in self._config["currencies"]:
+            try:
+                sums = self._convert(job, currency)
+            except Exception:
+                logger.exception(f"Failed to precompute {currency} sums")
+                continue
+            if sums is None:
+                logger.debug(
+                    f"Precomputing of version {job.version} cancelled"
+                )
+                return
+            with self._lock:
+                if job is not self._job:
+                    return
+                self._sums[(job.version, currency)] = sums
+            logger.debug(
+                f"Precomputed {currency} sums of version {job.version}"
+            )
+
+    def _convert(self, job, currency):
+        # Chunks let the job notice cancellation without converting every row
+        chunk_size = self._config["chunk_size"]
+        sums = numpy.empty(len(job.totals))
+        for begin in range(0, len(job.totals), chunk_size):
+            if job.cancelled.is_set():
+                return None
+            end = min(begin + chunk_size, len(job.totals))
+            sums[begin:end] = self._converter.convert(
+                job.dates.iloc[begin:end],
+                job.currencies.iloc[begin:end],
+                job.totals.iloc[begin:end],
+                currency,
+            )
+        return None if job.cancelled.is_set() else sums
@@ -1,5 +1,6 @@
 import functools
 
+import db.memory
 import db.utils
 import rates.providers
 
@@ -9,6 +10,13 @@ class DatabaseUsdRatesProxy(db.utils.DatabaseIO):
         super().__init__(config["path"])
         self._config = config
 
+    def __enter__(self):
+        memory_database = db.memory.find_database(self._path)
+        if memory_database is None:
+            return super().__enter__()
+        self._connection = memory_database.connect()
+        return self
+
     def get_rates(self, bids):
         return [self._get_rate(date, symbol) for date, symbol in bids]
 
@@ -41,6 +49,21 @@ class DatabaseUsdRatesProxy(db.utils.DatabaseIO):
         )
 
 
+def load_rates_database(config):
+    if config["in_memory"]:
+        db.memory.load_database(config["path"])
+
+
+def persist_rates_database(config):
+    if config["in_memory"]:
+        db.memory.persist_databases()
+
+
+def unload_rates_database(config):
+    if config["in_memory"]:
+        db.memory.close_databases()
+
+
 class CurrencyExchangeRatesProvider:
     def __init__(self, config):
         self._config = config
@@ -57,12 +57,22 @@ def _remove_transactions(operations, black_list):
 
 
 def _fill_missing_values(operations, fill_values):
-    missing_date_mask = operations[operations["payment_date"].isnull()].index
+    # Operations are ordered and sliced by date, so those without one are
+    # dropped instead of getting a fill value
+    missing_date_mask = operations[
+        operations["operation_date"].isnull()
+        | operations["payment_date"].isnull()
+    ].index
     operations.drop(missing_date_mask, inplace=True)
     for column_name in operations.columns:
         operations[column_name].fillna(fill_values[column_name], inplace=True)
 
 
+def _sort_operations(operations):
+    operations.sort_values(by="operation_date", kind="stable", inplace=True)
+    operations.reset_index(drop=True, inplace=True)
+
+
 def _convert_dates(operations):
     for column_name in ["operation_date", "payment_date"]:
         operations[column_name] = operations[column_name].astype(
@@ -84,4 +94,5 @@ class OperationsReader:
         _fill_missing_values(operations, self._config["fill_values"])
         _remove_transactions(operations, self._config["black_list_statuses"])
         _convert_dates(operations)
+        _sort_operations(operations)
         return operations
@@ -1,76 +1,245 @@
+import abc
+import collections
 import datetime
 
+import numpy
 import pandas
 
+import app.model.cube
+import app.model.index
+
+
+class _ConstraintMasksCache:
+    def __init__(self, max_masks_count):
+        self._max_masks_count = max_masks_count
+        self._masks = {}
+
+    def clear(self):
+        self._masks.clear()
+
+    def get(self, group, key, make_mask):
+        masks = self._masks.setdefault(group, collections.OrderedDict())
+        if key in masks:
+            masks.move_to_end(key)
+            return masks[key]
+        mask = make_mask()
+        masks[key] = mask
+        if len(masks) > self._max_masks_count:
+            masks.popitem(last=False)
+        return mask
+
 
 def _make_default_mask(values, default):
     return pandas.Series(default, index=values.index)
 
 
-def _make_dates_mask(dates, date_range):
-    start_date, end_date = date_range
-    if start_date is None:
-        start_date = dates.min()
-    if end_date is None:
-        end_date = dates.max()
-    return (start_date <= dates) & (dates <= end_date)
+def _make_dates_mask(index, date_range):
+    return index.make_mask(date_range)
 
 
-def _make_values_mask(values, white_list):
+def _make_values_mask(index, white_list):
     if white_list is None:
-        return _make_default_mask(values, False)
-    return values.isin(white_list)
+        return numpy.zeros(len(index), dtype=bool)
+    return index.make_mask(white_list)
 
 
-def _make_constraint_mask(operations, constraint):
+def _build_columns_indexes(operations):
     column_names = ["data_file", "card_number", "category", "description"]
-    value_names = ["data_files", "card_numbers", "categories", "descriptions"]
-    mask = _make_dates_mask(
-        operations["operation_date"], constraint["date_range"]
+    indexes = {
+        column_name: app.model.index.ColumnIndex(operations[column_name])
+        for column_name in column_names
+    }
+    indexes["operation_date"] = app.model.index.DatesIndex(
+        operations["operation_date"]
     )
+    indexes["operation_period"] = app.model.index.PeriodsIndex(
+        operations["operation_date"]
+    )
+    return indexes
+
+
+def _make_dates_key(date_range):
+    return tuple(date_range)
+
+
+def _make_values_key(white_list):
+    return None if white_list is None else frozenset(white_list)
+
+
+def _compile_constraint(constraint):
+    column_names = ["data_file", "card_number", "category", "description"]
+    value_names = ["data_files", "card_numbers", "categories", "descriptions"]
+    # A clause is a list of (group, key, filter) predicates ANDed together.
+    # Coarse filters go first, so clauses share longer prefixes
+    predicates = [
+        (
+            "operation_date",
+            _make_dates_key(constraint["date_range"]),
+            constraint["date_range"],
+        )
+    ]
     for column_name, value_name in zip(column_names, value_names):
-        values_mask = _make_values_mask(
-            operations[column_name], constraint[value_name]
+        predicates.append(
+            (
+                column_name,
+                _make_values_key(constraint[value_name]),
+                constraint[value_name],
+            )
         )
-        mask = mask & values_mask
-    return mask
+    return predicates
 
 
-def _make_constraints_mask(operations, constraints):
-    if constraints is None:
-        mask = _make_default_mask(operations, True)
-    else:
-        mask = _make_default_mask(operations, False)
+class _CompiledConstraints:
+    # Duplicate clauses are dropped as well as clauses with an empty white
+    # list, which never match. Predicates and prefix conjunctions used by
+    # several clauses are evaluated once per combination of the clauses
+    def __init__(self, constraints):
+        clauses = {}
         for constraint in constraints:
-            mask |= _make_constraint_mask(operations, constraint)
+            clause = _compile_constraint(constraint)
+            if any(key is None for _, key, _ in clause[1:]):
+                continue
+            clauses.setdefault(tuple(key for _, key, _ in clause), clause)
+        self._clauses = list(clauses.items())
+        predicates_counts = collections.Counter(
+            (group, key)
+            for _, clause in self._clauses
+            for group, key, _ in clause
+        )
+        prefixes_counts = collections.Counter(
+            clause_key[:length]
+            for clause_key, _ in self._clauses
+            for length in range(1, len(clause_key) + 1)
+        )
+        self._shared_predicates = {
+            predicate
+            for predicate, count in predicates_counts.items()
+            if count > 1
+        }
+        self._shared_prefixes = {
+            prefix for prefix, count in prefixes_counts.items() if count > 1
+        }
+
+    def get_key(self):
+        return frozenset(clause_key for clause_key, _ in self._clauses)
+
+    def make_mask(self, operations, indexes, masks):
+        # Shared masks live only while the clauses are combined, so they
+        # don't take space in the masks cache
+        components, products = {}, {}
+        mask = numpy.zeros(len(operations), dtype=bool)
+        for clause_key, clause in self._clauses:
+            clause_mask = None
+            for length, predicate in enumerate(clause, start=1):
+                prefix = clause_key[:length]
+                if prefix in products:
+                    clause_mask = products[prefix]
+                    continue
+                component = self._make_predicate_mask(
+                    predicate, indexes, masks, components
+                )
+                if clause_mask is None:
+                    clause_mask = component
+                else:
+                    clause_mask = clause_mask & component
+                if prefix in self._shared_prefixes:
+                    products[prefix] = clause_mask
+            mask |= clause_mask
+        return mask
+
+    def _make_predicate_mask(self, predicate, indexes, masks, components):
+        group, key, _ = predicate
+        if (group, key) in components:
+            return components[(group, key)]
+        component = _make_predicate_mask(predicate, indexes, masks)
+        if (group, key) in self._shared_predicates:
+            components[(group, key)] = component
+        return component
+
+
+def _make_predicate_mask(predicate, indexes, masks):
+    # Every predicate mask is cached under the value of its own filter, so
+    # changing a single control recomputes only the mask of that control
+    group, key, value = predicate
+    if group == "operation_date":
+        make_mask = lambda: _make_dates_mask(indexes[group], value)
+    else:
+        make_mask = lambda: _make_values_mask(indexes[group], value)
+    return masks.get(group=group, key=key, make_mask=make_mask)
+
+
+def _make_constraints_mask(operations, constraints, indexes, masks):
+    if constraints is None:
+        return _make_default_mask(operations, True)
+    compiled = _CompiledConstraints(constraints)
+    combined = masks.get(
+        group="constraints",
+        key=compiled.get_key(),
+        make_mask=lambda: compiled.make_mask(operations, indexes, masks),
+    )
+    mask = _make_default_mask(operations, False)
+    mask |= combined
     return mask
 
 
-def _get_operations(operations, mask):
+def _get_rows(operations, mask):
     if mask is None:
-        mask = _make_default_mask(operations, True)
-    return operations[mask].copy()
+        return numpy.arange(len(operations))
+    return numpy.flatnonzero(numpy.asarray(mask))
 
 
-def _get_income(operations, mask):
+def _get_income_rows(operations, mask):
     if mask is None:
         mask = _make_default_mask(operations, True)
-    income_mask = (operations["operation_sum"] >= 0) & mask
-    income = operations[income_mask].copy()
-    income.sort_values(by="operation_date", inplace=True)
-    income.reset_index(inplace=True)
-    return income
+    sums = operations["operation_sum"].to_numpy()
+    return numpy.flatnonzero((sums >= 0) & numpy.asarray(mask))
 
 
-def _get_spending(operations, mask):
+def _get_spending_rows(operations, mask):
     if mask is None:
         mask = _make_default_mask(operations, True)
-    spending_mask = (operations["operation_sum"] < 0) & mask
-    spending = operations[spending_mask].copy()
-    spending["operation_sum"] *= -1
-    spending.sort_values(by="operation_date", inplace=True)
-    spending.reset_index(inplace=True)
-    return spending
+    sums = operations["operation_sum"].to_numpy()
+    return numpy.flatnonzero((sums < 0) & numpy.asarray(mask))
+
+
+def _take_columns(operations, rows, column_names, negate_sums=False):
+    # The only place where selected rows are copied. Operations are sorted by
+    # date at load time, so rows taken in order stay sorted by date
+    view = pandas.DataFrame(
+        {
+            column_name: operations[column_name].array.take(rows)
+            for column_name in column_names
+        }
+    )
+    if negate_sums:
+        view["operation_sum"] *= -1
+    return view
+
+
+def get_operations_page(operations, rows, settings):
+    # Selected rows are ordered and only the rows of the requested page are
+    # copied. Pages past the end are clamped to the last one
+    page_size = settings["operations_page_size"]
+    pages_count = max(1, -(-len(rows) // page_size))
+    page = min(max(settings["operations_page"], 0), pages_count - 1)
+    column_name = settings["operations_sort_column"]
+    ascending = settings["operations_sort_ascending"]
+    if column_name == "operation_date":
+        # Operations are sorted by date at load time
+        rows = rows if ascending else rows[::-1]
+    elif column_name is not None:
+        values = operations[column_name].iloc[rows].reset_index(drop=True)
+        order = values.sort_values(
+            ascending=ascending, kind="stable", na_position="last"
+        ).index.to_numpy()
+        rows = rows[order]
+    return {
+        "table": operations.take(
+            rows[page * page_size : (page + 1) * page_size]
+        ),
+        "rows_count": len(rows),
+        "page": page,
+    }
 
 
 def _accumulate_operation_sum(operations, accumulation_type):
@@ -83,126 +252,361 @@ def _accumulate_operation_sum(operations, accumulation_type):
     return operations
 
 
-def _make_digest(strings):
-    return ",".join(strings.unique())
-
-
-def _aggreagate_operations_by_period(operations, period):
-    rules = {"seconds": "S", "days": "D", "months": "M", "years": "AS"}
-    if period not in rules:
-        raise RuntimeError("Unknown period {period}")
-    elif period == "seconds":
-        return operations
-    else:
-        aggregated = operations.resample(
-            rule=rules[period],
-            on="operation_date",
-            closed="left",
-            label="left",
-        ).aggregate(
+def _make_digests(index, rows, buckets, buckets_count, max_values_count):
+    # Same as ",".join(values.unique()) per bucket over the values of the rows
+    # taken in order. Buckets of the rows are expected to be non-decreasing
+    digests = numpy.full(buckets_count, "", dtype=object)
+    if len(rows) == 0:
+        return digests
+    codes = index.get_codes(rows)
+    keys = buckets * (codes.max() + 1) + codes
+    _, first_rows = numpy.unique(keys, return_index=True)
+    first_rows.sort()
+    first_buckets = buckets[first_rows]
+    starts = numpy.flatnonzero(numpy.diff(first_buckets, prepend=-1))
+    if max_values_count is not None:
+        ranks = numpy.arange(len(first_rows)) - numpy.repeat(
+            starts, numpy.diff(numpy.append(starts, len(first_rows)))
+        )
+        first_rows = first_rows[ranks < max_values_count]
+        first_buckets = buckets[first_rows]
+        starts = numpy.flatnonzero(numpy.diff(first_buckets, prepend=-1))
+    strings = index.decode(codes[first_rows])
+    items = "," + strings
+    items[starts] = strings[starts]
+    digests[first_buckets[starts]] = numpy.add.reduceat(items, starts)
+    return digests
+
+
+def _aggreagate_operations_by_period(
+    operations,
+    rows,
+    period,
+    indexes,
+    negate_sums=False,
+    buckets=None,
+    sums=None,
+    max_digest_values_count=None,
+    max_digest_buckets_count=None,
+):
+    if period == "seconds":
+        return _take_columns(
+            operations,
+            rows,
+            [
+                "operation_date",
+                "operation_sum",
+                "data_file",
+                "category",
+                "description",
+            ],
+            negate_sums,
+        )
+    elif period not in app.model.index.PeriodsIndex.PERIODS:
+        raise RuntimeError(f"Unknown period {period}")
+    # Sums may come from the cube cells, raw rows are needed for digests only
+    row_buckets = indexes["operation_period"].get_codes(period, rows)
+    if sums is None:
+        buckets = row_buckets
+        sums = operations["operation_sum"].to_numpy()[rows]
+        if negate_sums:
+            sums = -sums
+    aggregated = pandas.DataFrame(
+        {"operation_date": pandas.DatetimeIndex([]), "operation_sum": []}
+    )
+    if len(buckets) > 0:
+        # Buckets are non-decreasing as operations are sorted by date
+        first_bucket = buckets[0]
+        buckets_count = buckets[-1] - first_bucket + 1
+        aggregated = pandas.DataFrame(
             {
-                "operation_sum": "sum",
-                "data_file": _make_digest,
-                "category": _make_digest,
-                "description": _make_digest,
+                "operation_date": app.model.index.PeriodsIndex.decode(
+                    period,
+                    numpy.arange(first_bucket, first_bucket + buckets_count),
+                ),
+                "operation_sum": numpy.bincount(
+                    buckets - first_bucket,
+                    weights=sums,
+                    minlength=buckets_count,
+                ),
             }
         )
-        aggregated.reset_index(inplace=True)
-        return aggregated
+        row_buckets = row_buckets - first_bucket
+    skip_digests = (
+        max_digest_buckets_count is not None
+        and len(aggregated) > max_digest_buckets_count
+    )
+    for column_name in ["data_file", "category", "description"]:
+        aggregated[column_name] = _make_digests(
+            index=indexes[column_name],
+            rows=rows[:0] if skip_digests else rows,
+            buckets=row_buckets,
+            buckets_count=len(aggregated),
+            max_values_count=max_digest_values_count,
+        )
+    return aggregated
+
+
+def _sum_by_code_and_sign(index, rows, sums):
+    # Income and spending of a code land in adjacent cells, so both come out
+    # of a single bincount over the selected rows
+    keys = index.get_codes(rows) * 2 + (sums >= 0)
+    length = 2 * index.get_codes_count()
+    counts = numpy.bincount(keys, minlength=length).reshape(-1, 2)
+    totals = numpy.bincount(
+        keys, weights=numpy.abs(sums), minlength=length
+    ).reshape(-1, 2)
+    # Code 0 stands for missing values, which groupby would drop
+    counts[0] = 0
+    return counts, totals
+
+
+def _get_overview_operations_by_category(
+    index, counts, totals, top_categories_count
+):
+    codes = numpy.flatnonzero(counts)
+    categories = index.decode(codes)
+    sums = totals[codes]
+    if len(codes) > top_categories_count:
+        is_top = numpy.zeros(len(codes), dtype=bool)
+        if top_categories_count > 0:
+            is_top[
+                numpy.argpartition(-sums, top_categories_count - 1)[
+                    :top_categories_count
+                ]
+            ] = True
+        categories = numpy.append(categories[is_top], "Ocтальное")
+        sums = numpy.append(sums[is_top], sums[~is_top].sum())
+    order = numpy.argsort(-sums, kind="stable")
+    return pandas.DataFrame(
+        {"category": categories[order], "operation_sum": sums[order]}
+    )
 
 
-def _aggregate_operations_by_category(operations):
-    view = operations.groupby("category").aggregate({"operation_sum": "sum"})
-    view.sort_values(by="operation_sum", ascending=False, inplace=True)
-    view.reset_index(inplace=True)
+def _get_overview_operations_by_card(index, counts, totals):
+    codes = numpy.flatnonzero(counts.any(axis=1))
+    view = pandas.DataFrame(
+        {
+            "card_number": index.decode(codes),
+            "income": totals[codes, 1],
+            "spending": totals[codes, 0],
+        }
+    )
+    view.sort_values(by="card_number", inplace=True)
+    view.reset_index(drop=True, inplace=True)
     return view
 
 
-def _get_overview_operations_by_category(operations, top_categories_count):
-    view = _aggregate_operations_by_category(operations)
-    top_categories_count = min(top_categories_count, len(view))
-    view.loc[top_categories_count:, "category"] = "Ocтальное"
-    return _aggregate_operations_by_category(view)
-
-
-def _get_overview_operations_by_card(operations, mask):
-    view = operations.loc[mask, ["card_number", "operation_sum"]].copy()
-    view["type"] = view["operation_sum"].map(
-        lambda quantity: "income" if quantity >= 0 else "spending"
+def _get_overview_operations(
+    category_index, card_index, rows, sums, top_categories_count
+):
+    category_counts, category_totals = _sum_by_code_and_sign(
+        category_index, rows, sums
     )
-    view = view.pivot_table(
-        values="operation_sum",
-        index="card_number",
-        columns="type",
-        aggfunc="sum",
+    card_counts, card_totals = _sum_by_code_and_sign(card_index, rows, sums)
+    return {
+        "income": _get_overview_operations_by_category(
+            category_index,
+            category_counts[:, 1],
+            category_totals[:, 1],
+            top_categories_count,
+        ),
+        "spending": _get_overview_operations_by_category(
+            category_index,
+            category_counts[:, 0],
+            category_totals[:, 0],
+            top_categories_count,
+        ),
+        "cards": _get_overview_operations_by_card(
+            card_index, card_counts, card_totals
+        ),
+    }
+
+
+def _get_currencies_totals(currencies, sums):
+    # Sums are a rows x currencies matrix, so the totals of all the
+    # currencies come from a single product with the income/spending masks
+    is_income = sums[:, 0] >= 0
+    sides = numpy.stack([is_income, ~is_income]).astype(sums.dtype)
+    income_totals, spending_totals = sides @ sums
+    spending_totals = -spending_totals
+    return pandas.DataFrame(
+        {
+            "currency": currencies,
+            "income_total": income_totals,
+            "spending_total": spending_totals,
+            "disposable_income_total": income_totals - spending_totals,
+        }
     )
-    for column_name in ["income", "spending"]:
-        if column_name not in view:
-            view[column_name] = 0
-    view.reset_index(inplace=True)
-    view["spending"] *= -1
-    return view
 
 
 def _get_date_range(operations, mask):
     if operations.empty:
         return (None, None)
-    if mask is None:
-        mask = _make_default_mask(operations, True)
-    view = operations.loc[mask, "operation_date"]
-    start_date = (
-        None if view.empty else view.min().date() - datetime.timedelta(days=1)
-    )
-    end_date = (
-        None if view.empty else view.max().date() + datetime.timedelta(days=1)
-    )
+    # Operations are sorted by date, so the first and the last selected rows
+    # hold the earliest and the latest dates
+    rows = _get_rows(operations, mask)
+    if len(rows) == 0:
+        return (None, None)
+    dates = operations["operation_date"]
+    start_date = dates.iloc[rows[0]].date() - datetime.timedelta(days=1)
+    end_date = dates.iloc[rows[-1]].date() + datetime.timedelta(days=1)
     return (start_date, end_date)
 
 
-def _get_unique_data_files(operations, mask):
-    return _get_unique_column(operations, mask, "data_file")
+def _get_unique_data_files(indexes, mask):
+    return _get_unique_column(indexes, mask, "data_file")
 
 
-def _get_unique_categories(operations, mask):
-    return _get_unique_column(operations, mask, "category")
+def _get_unique_categories(indexes, mask):
+    return _get_unique_column(indexes, mask, "category")
 
 
-def _get_unique_descriptions(operations, mask):
-    return _get_unique_column(operations, mask, "description")
+def _get_unique_descriptions(indexes, mask):
+    return _get_unique_column(indexes, mask, "description")
 
 
-def _get_unique_card_numbers(operations, mask):
-    return _get_unique_column(operations, mask, "card_number")
+def _get_unique_card_numbers(indexes, mask):
+    return _get_unique_column(indexes, mask, "card_number")
 
 
-def _get_unique_column(operations, mask, column):
-    if mask is None:
-        mask = _make_default_mask(operations, True)
-    return list(operations.loc[mask, column].unique())
+def _get_unique_column(indexes, mask, column):
+    if mask is not None:
+        mask = numpy.asarray(mask)
+    return indexes[column].get_unique_values(mask)
+
+
+def _count_column_values(indexes, mask, column, values):
+    if mask is not None:
+        mask = numpy.asarray(mask)
+    counts = indexes[column].count_values(mask)
+    return counts.loc[values].tolist()
+
 
+class OperationsReporterBackend(abc.ABC):
+    # Operations passed to the reports are the ones passed to load with
+    # operation_sum set to the sums in the currency of the settings. Sums
+    # are required only for the rows selected by the constraints, as well as
+    # overview_sum_<currency> columns of the overview currencies. Columns
+    # operation_sum_<currency> hold the sums of every row once a currency is
+    # fully converted
+    @abc.abstractmethod
+    def load(self, operations):
+        del operations
 
-class OperationsReporter:
+    @abc.abstractmethod
+    def select_rows(self, operations, constraints):
+        del operations
+        del constraints
+
+    @abc.abstractmethod
+    def report_operations(self, operations, constraints, settings):
+        del operations
+        del constraints
+        del settings
+
+    @abc.abstractmethod
+    def report_transactions(self, operations, constraints, settings):
+        del operations
+        del constraints
+        del settings
+
+    @abc.abstractmethod
+    def report_overview(self, operations, constraints, settings):
+        del operations
+        del constraints
+        del settings
+
+    @abc.abstractmethod
+    def report_operations_stats(self, operations, constraints, settings):
+        del operations
+        del constraints
+        del settings
+
+
+class PandasOperationsReporter(OperationsReporterBackend):
     def __init__(self, config):
         self._config = config
+        self._indexes = None
+        self._cubes = {}
+        self._masks = _ConstraintMasksCache(
+            self._config["max_cached_masks_count"]
+        )
+
+    def load(self, operations):
+        self._indexes = _build_columns_indexes(operations)
+        self._cubes.clear()
+        self._masks.clear()
+
+    def _make_constraints_mask(self, operations, constraints):
+        return _make_constraints_mask(
+            operations, constraints, self._indexes, self._masks
+        )
+
+    def _find_cube(self, operations, constraints, currency):
+        # Cube of a currency is built once its conversion is available and
+        # is used as long as it can answer the constraints
+        column_name = f"operation_sum_{currency}"
+        if column_name not in operations:
+            return None
+        if currency not in self._cubes:
+            self._cubes[currency] = app.model.cube.OperationsCube(
+                operations, operations[column_name]
+            )
+        cube = self._cubes[currency]
+        return cube if cube.covers(constraints) else None
+
+    def select_rows(self, operations, constraints):
+        mask = self._make_constraints_mask(operations, constraints)
+        return _get_rows(operations, mask)
 
     def report_operations(self, operations, constraints, settings):
-        del settings
-        mask = _make_constraints_mask(operations, constraints)
-        return {"table": _get_operations(operations, mask)}
+        mask = self._make_constraints_mask(operations, constraints)
+        return get_operations_page(
+            operations, _get_rows(operations, mask), settings
+        )
 
     def report_transactions(self, operations, constraints, settings):
-        mask = _make_constraints_mask(operations, constraints)
+        mask = self._make_constraints_mask(operations, constraints)
+        period = settings["transactions_period"]
+        income_buckets, income_sums = None, None
+        spending_buckets, spending_sums = None, None
+        if period != "seconds":
+            cube = self._find_cube(
+                operations, constraints, settings["currency"]
+            )
+            if cube is not None:
+                cells_mask = cube.make_mask(constraints)
+                income_cells = cube.get_income_rows(cells_mask)
+                income_buckets = cube.get_buckets(period, income_cells)
+                income_sums = cube.get_sums(income_cells)
+                spending_cells = cube.get_spending_rows(cells_mask)
+                spending_buckets = cube.get_buckets(period, spending_cells)
+                spending_sums = -cube.get_sums(spending_cells)
         income = _aggreagate_operations_by_period(
-            operations=_get_income(operations, mask),
-            period=settings["transactions_period"],
+            operations=operations,
+            rows=_get_income_rows(operations, mask),
+            period=period,
+            indexes=self._indexes,
+            buckets=income_buckets,
+            sums=income_sums,
+            max_digest_values_count=self._config["max_digest_values_count"],
+            max_digest_buckets_count=self._config["max_digest_buckets_count"],
         )
         _accumulate_operation_sum(
             operations=income,
             accumulation_type=settings["transactions_report_type"],
         )
         spending = _aggreagate_operations_by_period(
-            operations=_get_spending(operations, mask),
-            period=settings["transactions_period"],
+            operations=operations,
+            rows=_get_spending_rows(operations, mask),
+            period=period,
+            indexes=self._indexes,
+            negate_sums=True,
+            buckets=spending_buckets,
+            sums=spending_sums,
+            max_digest_values_count=self._config["max_digest_values_count"],
+            max_digest_buckets_count=self._config["max_digest_buckets_count"],
         )
         _accumulate_operation_sum(
             operations=spending,
@@ -214,16 +618,29 @@ class OperationsReporter:
         }
 
     def report_overview(self, operations, constraints, settings):
-        del settings
-        mask = _make_constraints_mask(operations, constraints)
-        income = _get_overview_operations_by_category(
-            _get_income(operations, mask),
-            self._config["max_overview_categories_count"],
-        )
-        spending = _get_overview_operations_by_category(
-            _get_spending(operations, mask),
-            self._config["max_overview_categories_count"],
-        )
+        top_categories_count = self._config["max_overview_categories_count"]
+        currencies = settings["overview_currencies"]
+        cube = self._find_cube(operations, constraints, settings["currency"])
+        if cube is None:
+            mask = self._make_constraints_mask(operations, constraints)
+            rows = _get_rows(operations, mask)
+            view = _get_overview_operations(
+                category_index=self._indexes["category"],
+                card_index=self._indexes["card_number"],
+                rows=rows,
+                sums=operations["operation_sum"].to_numpy()[rows],
+                top_categories_count=top_categories_count,
+            )
+        else:
+            rows = numpy.flatnonzero(cube.make_mask(constraints))
+            view = _get_overview_operations(
+                category_index=cube.get_index("category"),
+                card_index=cube.get_index("card_number"),
+                rows=rows,
+                sums=cube.get_sums(rows),
+                top_categories_count=top_categories_count,
+            )
+        income, spending = view["income"], view["spending"]
         income_total = income["operation_sum"].sum()
         spending_total = spending["operation_sum"].sum()
         return {
@@ -232,16 +649,57 @@ class OperationsReporter:
             "disposable_income_total": income_total - spending_total,
             "income": income,
             "spending": spending,
-            "cards": _get_overview_operations_by_card(operations, mask),
+            "cards": view["cards"],
+            "currencies_totals": (
+                _get_currencies_totals(
+                    currencies,
+                    self._get_currencies_sums(
+                        operations, constraints, currencies
+                    ),
+                )
+                if currencies
+                else None
+            ),
         }
 
+    def _get_currencies_sums(self, operations, constraints, currencies):
+        # Cubes exist only for fully converted currencies. Rates keep the
+        # signs of the sums, so cubes of all the currencies have the same
+        # cells. Otherwise sums come from the rows selected by the constraints
+        cubes = [
+            self._find_cube(operations, constraints, currency)
+            for currency in currencies
+        ]
+        if all(cube is not None for cube in cubes):
+            rows = numpy.flatnonzero(cubes[0].make_mask(constraints))
+            return numpy.column_stack([cube.get_sums(rows) for cube in cubes])
+        mask = self._make_constraints_mask(operations, constraints)
+        rows = _get_rows(operations, mask)
+        return numpy.column_stack(
+            [
+                operations[f"overview_sum_{currency}"].to_numpy()[rows]
+                for currency in currencies
+            ]
+        )
+
     def report_operations_stats(self, operations, constraints, settings):
         del settings
-        mask = _make_constraints_mask(operations, constraints)
-        return {
+        mask = self._make_constraints_mask(operations, constraints)
+        report = {
             "date_range": _get_date_range(operations, mask),
-            "data_files": _get_unique_data_files(operations, mask),
-            "categories": _get_unique_categories(operations, mask),
-            "descriptions": _get_unique_descriptions(operations, mask),
-            "card_numbers": _get_unique_card_numbers(operations, mask),
+            "data_files": _get_unique_data_files(self._indexes, mask),
+            "categories": _get_unique_categories(self._indexes, mask),
+            "descriptions": _get_unique_descriptions(self._indexes, mask),
+            "card_numbers": _get_unique_card_numbers(self._indexes, mask),
         }
+        # Operations count of every value goes with the value
+        for report_name, column_name in [
+            ("data_files", "data_file"),
+            ("categories", "category"),
+            ("descriptions", "description"),
+            ("card_numbers", "card_number"),
+        ]:
+            report[f"{report_name}_counts"] = _count_column_values(
+                self._indexes, mask, column_name, report[report_name]
+            )
+        return report
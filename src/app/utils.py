@@ -1,6 +1,10 @@
+import contextlib
 import json
 import logging
 import logging.config
+import tracemalloc
+
+logger = logging.getLogger(__name__)
 
 
 def read_json(path):
@@ -29,3 +33,21 @@ def init_logging():
         },
     }
     logging.config.dictConfig(log_config)
+
+
+@contextlib.contextmanager
+def trace_peak_memory(name):
+    # Measures only when tracemalloc is on, e.g. with PYTHONTRACEMALLOC=1
+    if not tracemalloc.is_tracing():
+        yield
+        return
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.clear_traces()
+    start_size, _ = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        _, peak_size = tracemalloc.get_traced_memory()
+        logger.debug(f"Peak memory of {name}: {peak_size - start_size} bytes")
@@ -1,10 +1,16 @@
 import bokeh.models
 import bokeh.palettes
+import contextlib
 import datetime
+import logging
 
 import app.view.callbacks
+import app.view.downsample
 import app.view.elements
 import app.view.localizer
+import app.view.sources
+
+logger = logging.getLogger(__name__)
 
 
 def _get_spectral_colors(count):
@@ -18,8 +24,10 @@ def _update_date_picker_element(element, value):
         element.value = value
 
 
-def _update_multi_select_element(element, value):
-    element.options = value
+def _update_multi_select_element(element, value, counts):
+    element.options = [
+        (option, f"{option} ({count})") for option, count in zip(value, counts)
+    ]
     element.value = value
 
 
@@ -29,6 +37,8 @@ class RevealAppView:
         self._localizer = None
         self._elements = None
         self._callbacks = None
+        self._holding_updates = False
+        self._status_before_progress = None
 
     def setup(self, controller):
         self._controller = controller
@@ -50,6 +60,35 @@ class RevealAppView:
 
     representation = property(_get_representation)
 
+    @contextlib.contextmanager
+    def hold_updates(self, name):
+        # Changes of a refresh are combined and sent once it is done instead
+        # of a message per changed property
+        document = self.representation.document
+        if document is None or self._holding_updates:
+            yield
+            return
+        self._holding_updates = True
+        self._callbacks.defer_setups()
+        document.hold("combine")
+        messages_count = 0
+
+        def count_message(event):
+            nonlocal messages_count
+            messages_count += 1
+
+        try:
+            yield
+        finally:
+            document.on_change(count_message)
+            try:
+                document.unhold()
+            finally:
+                document.remove_on_change(count_message)
+                self._callbacks.apply_deferred_setups()
+                self._holding_updates = False
+            logger.debug(f"{name} sent {messages_count} patch messages")
+
     def _set_source_data(self, name, value):
         source = self._elements[name]
         if not isinstance(source, bokeh.models.ColumnDataSource):
@@ -57,11 +96,14 @@ class RevealAppView:
                 f"Element {name} is not a bokeh.models.ColumnDataSource object"
             )
             raise RuntimeError(message)
+        default_data = self._elements.get_default_source_data(name)
         if value is None or value.empty:
-            data = self._elements.get_default_source_data(name)
+            data = default_data
         else:
-            data = value
-        source.data = data
+            data = app.view.sources.project_columns(value, default_data.keys())
+        app.view.sources.update_source_data(
+            source, data, self._config["sources"]["max_change_ratio"]
+        )
 
     def get_date_range(self):
         return (
@@ -84,6 +126,9 @@ class RevealAppView:
     def get_currency(self):
         return self._elements["currency_select"].value
 
+    def get_currencies(self):
+        return list(self._elements["currency_select"].options)
+
     def get_transactions_plot_mode(self):
         mode = self._elements["transactions_tab_plot_mode_selector"].value
         if mode == self._localizer.get_literal(
@@ -108,10 +153,18 @@ class RevealAppView:
             "transactions_tab_period_selector_days_option_title"
         ):
             return "days"
+        elif mode == self._localizer.get_literal(
+            "transactions_tab_period_selector_weeks_option_title"
+        ):
+            return "weeks"
         elif mode == self._localizer.get_literal(
             "transactions_tab_period_selector_months_option_title"
         ):
             return "months"
+        elif mode == self._localizer.get_literal(
+            "transactions_tab_period_selector_quarters_option_title"
+        ):
+            return "quarters"
         elif mode == self._localizer.get_literal(
             "transactions_tab_period_selector_years_option_title"
         ):
@@ -133,18 +186,22 @@ class RevealAppView:
         _update_multi_select_element(
             element=self._elements["category_multi_select"],
             value=values["categories"],
+            counts=values["categories_counts"],
         )
         _update_multi_select_element(
             element=self._elements["description_multi_select"],
             value=values["descriptions"],
+            counts=values["descriptions_counts"],
         )
         _update_multi_select_element(
             element=self._elements["card_number_multi_select"],
             value=values["card_numbers"],
+            counts=values["card_numbers_counts"],
         )
         _update_multi_select_element(
             element=self._elements["data_file_multi_select"],
             value=values["data_files"],
+            counts=values["data_files_counts"],
         )
         self._callbacks.setup_controls_callbacks()
 
@@ -162,6 +219,26 @@ class RevealAppView:
             "overview_tab_disposable_income_text", disposable_income
         )
 
+    def show_overview_currencies_totals(self, currencies_totals):
+        for name, column_name in [
+            ("overview_tab_income_currencies_text", "income_total"),
+            ("overview_tab_spending_currencies_text", "spending_total"),
+            (
+                "overview_tab_disposable_income_currencies_text",
+                "disposable_income_total",
+            ),
+        ]:
+            text = ""
+            if currencies_totals is not None:
+                text = "<br>".join(
+                    f"{value:,.2f} {currency}"
+                    for currency, value in zip(
+                        currencies_totals["currency"],
+                        currencies_totals[column_name],
+                    )
+                )
+            self._elements[name].text = text
+
     def _setup_overview_text(self, name, value):
         self._elements[name].text = f"{value:,.2f}"
 
@@ -198,35 +275,137 @@ class RevealAppView:
             figure.x_range.factors = list(operations["category"])
         self._set_source_data(source_name, operations)
 
-    def show_transactions(self, income, spending):
+    def get_transactions_window(self):
+        # Ranges changed in the browser come back as milliseconds since epoch
+        x_range = self._elements["transactions_figure"].x_range
+        window = []
+        for value in [x_range.start, x_range.end]:
+            if value is None:
+                return None
+            if isinstance(value, (int, float)):
+                value = datetime.datetime(1970, 1, 1) + datetime.timedelta(
+                    milliseconds=value
+                )
+            window.append(value)
+        return tuple(window)
+
+    def get_transactions_plot_width(self):
+        # Width is known once the browser has laid the figure out
+        width = self._elements["transactions_figure"].inner_width
+        if not width:
+            width = self._config["transactions_plot"]["default_width"]
+        return width
+
+    def show_transactions(self, income, spending, keep_range=False):
+        if not keep_range:
+            self._reset_transactions_range(income, spending)
+        max_points_count = int(
+            self.get_transactions_plot_width()
+            * self._config["transactions_plot"]["points_per_pixel"]
+        )
+        for name, operations in [
+            ("income_source", income),
+            ("spending_source", spending),
+        ]:
+            self._set_source_data(
+                name,
+                app.view.downsample.downsample_operations(
+                    operations, max_points_count
+                ),
+            )
+
+    def _reset_transactions_range(self, income, spending):
         start_dates = [datetime.datetime(year=2070, month=1, day=1)]
         end_dates = [datetime.datetime(year=1970, month=1, day=1)]
-        if income is not None:
-            income.sort_values(
-                by="operation_date", inplace=True, ascending=True
-            )
-            if not income.empty:
-                start_dates.append(income["operation_date"].iloc[0])
-                end_dates.append(income["operation_date"].iloc[-1])
-        if spending is not None:
-            spending.sort_values(
-                by="operation_date", inplace=True, ascending=True
-            )
-            if not spending.empty:
-                start_dates.append(spending["operation_date"].iloc[0])
-                end_dates.append(spending["operation_date"].iloc[-1])
+        # Transactions come from the model already sorted by date
+        if income is not None and not income.empty:
+            start_dates.append(income["operation_date"].iloc[0])
+            end_dates.append(income["operation_date"].iloc[-1])
+        if spending is not None and not spending.empty:
+            start_dates.append(spending["operation_date"].iloc[0])
+            end_dates.append(spending["operation_date"].iloc[-1])
         figure = self._elements["transactions_figure"]
+        self._callbacks.reset_transactions_range_callbacks()
         figure.x_range.start = min(start_dates)
         figure.x_range.end = max(end_dates)
-        self._set_source_data("income_source", income)
-        self._set_source_data("spending_source", spending)
+        self._callbacks.setup_transactions_range_callbacks()
+
+    def get_operations_table_sort_column(self):
+        title = self._elements["operations_table_sort_column_selector"].value
+        tabs_group_config = self._config["elements"]["root"]["tabs_group"]
+        columns = tabs_group_config["table_tab"]["operations_table"]["columns"]
+        for info in columns:
+            if title == self._localizer.get_literal(
+                f"{info['name']}_field_title"
+            ):
+                return info["field"]
+        message = "Unknown operations_table_sort_column_selector column"
+        raise RuntimeError(message)
+
+    def get_operations_table_sort_ascending(self):
+        order = self._elements["operations_table_sort_order_selector"].value
+        if order == self._localizer.get_literal(
+            "table_tab_sort_order_selector_ascending_option_title"
+        ):
+            return True
+        elif order == self._localizer.get_literal(
+            "table_tab_sort_order_selector_descending_option_title"
+        ):
+            return False
+        else:
+            message = "Unknown operations_table_sort_order_selector order"
+            raise RuntimeError(message)
 
-    def show_operations_table(self, operations):
+    def get_operations_table_page(self):
+        page = self._elements["operations_table_page_spinner"].value
+        # A cleared spinner has no value, the first page is shown then
+        if page is None:
+            return 0
+        return page - 1
+
+    def reset_operations_table_page(self):
+        self._set_operations_table_page(page=0, pages_count=None)
+
+    def _set_operations_table_page(self, page, pages_count):
+        spinner = self._elements["operations_table_page_spinner"]
+        self._callbacks.reset_operations_table_page_callbacks()
+        if pages_count is not None:
+            spinner.high = pages_count
+        spinner.value = page + 1
+        self._callbacks.setup_operations_table_page_callbacks()
+
+    def show_operations_table(self, operations, rows_count, page, page_size):
+        self._set_operations_table_page(
+            page=page, pages_count=max(1, -(-rows_count // page_size))
+        )
+        first = min(page * page_size + 1, rows_count)
+        last = min((page + 1) * page_size, rows_count)
+        self._elements["operations_table_rows_text"].text = (
+            self._localizer.get_literal("table_tab_rows_text").format(
+                first=first, last=last, count=rows_count
+            )
+        )
         self._set_source_data("operations_table_source", operations)
 
     def _show_status_message(self, message):
         self._elements["status_bar"].text = message
 
+    def show_status_message(self, message):
+        self._show_status_message(message)
+
+    def show_progress_status_message(self):
+        self._status_before_progress = self._elements["status_bar"].text
+        self._show_status_message(
+            self._localizer.get_literal("status_bar_computing_title")
+        )
+
+    def hide_progress_status_message(self):
+        # Messages shown while the work was running are kept
+        if self._elements["status_bar"].text == self._localizer.get_literal(
+            "status_bar_computing_title"
+        ):
+            self._show_status_message(self._status_before_progress)
+
     def show_loading_status_message(self):
         self._show_status_message(
             self._localizer.get_literal("status_bar_loading_title")
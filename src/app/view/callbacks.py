@@ -2,11 +2,16 @@ class ViewCallbacksManager:
     def __init__(self, elements, controller):
         self._elements = elements
         self._controller = controller
+        self._deferred_setups = None
         self._toggles = {
             "upload_button": self._upload_button_toggle,
             "tabs_group": self._tabs_group_toggle,
             "transactions_tab_plot_mode_selector": self._transactions_tab_plot_mode_selector_toggle,
             "transactions_tab_period_selector": self._transactions_tab_period_selector_toggle,
+            "transactions_figure_x_range": self._transactions_figure_x_range_toggle,
+            "operations_table_sort_column_selector": self._operations_table_sort_column_selector_toggle,
+            "operations_table_sort_order_selector": self._operations_table_sort_order_selector_toggle,
+            "operations_table_page_spinner": self._operations_table_page_spinner_toggle,
             "start_date_picker": self._start_date_picker_toggle,
             "end_date_picker": self._end_date_picker_toggle,
             "category_multi_select": self._category_multi_select_toggle,
@@ -29,6 +34,30 @@ class ViewCallbacksManager:
     def reset_controls_callbacks(self):
         self._toggle_controls_callbacks(how="off")
 
+    def setup_transactions_range_callbacks(self):
+        self._toggle_callbacks("on", ["transactions_figure_x_range"])
+
+    def reset_transactions_range_callbacks(self):
+        self._toggle_callbacks("off", ["transactions_figure_x_range"])
+
+    def setup_operations_table_page_callbacks(self):
+        self._toggle_callbacks("on", ["operations_table_page_spinner"])
+
+    def reset_operations_table_page_callbacks(self):
+        self._toggle_callbacks("off", ["operations_table_page_spinner"])
+
+    def defer_setups(self):
+        # Under a document hold Bokeh runs change callbacks on unhold with
+        # the callbacks registered by then. Muted callbacks are turned back
+        # on after the unhold, so changes made while they were muted still
+        # don't reach the controller
+        self._deferred_setups = []
+
+    def apply_deferred_setups(self):
+        control_names = self._deferred_setups
+        self._deferred_setups = None
+        self._toggle_callbacks("on", control_names)
+
     def _toggle_controls_callbacks(self, how):
         control_names = [
             "start_date_picker",
@@ -42,6 +71,13 @@ class ViewCallbacksManager:
 
     def _toggle_callbacks(self, how, control_names):
         for control_name in control_names:
+            if self._deferred_setups is not None:
+                # Deferred callbacks are off until the setups are applied
+                if control_name in self._deferred_setups:
+                    continue
+                elif how == "on":
+                    self._deferred_setups.append(control_name)
+                    continue
             toggle = self._toggles[control_name]
             toggle(how)
 
@@ -83,6 +119,41 @@ class ViewCallbacksManager:
             handler=self._controller.on_transactions_tab_plot_settings_change,
         )
 
+    def _transactions_figure_x_range_toggle(self, how):
+        x_range = self._elements["transactions_figure"].x_range
+        handler = self._controller.on_transactions_range_change
+        for attr_name in ["start", "end"]:
+            if how == "on":
+                x_range.on_change(attr_name, handler)
+            elif how == "off":
+                x_range.remove_on_change(attr_name, handler)
+            else:
+                assert how in ["on", "off"]
+
+    def _operations_table_sort_column_selector_toggle(self, how):
+        self._value_callback_toggle(
+            how,
+            control_name="operations_table_sort_column_selector",
+            attr_name="value",
+            handler=self._controller.on_operations_table_sort_change,
+        )
+
+    def _operations_table_sort_order_selector_toggle(self, how):
+        self._value_callback_toggle(
+            how,
+            control_name="operations_table_sort_order_selector",
+            attr_name="value",
+            handler=self._controller.on_operations_table_sort_change,
+        )
+
+    def _operations_table_page_spinner_toggle(self, how):
+        self._value_callback_toggle(
+            how,
+            control_name="operations_table_page_spinner",
+            attr_name="value",
+            handler=self._controller.on_operations_table_page_change,
+        )
+
     def _start_date_picker_toggle(self, how):
         self._value_callback_toggle(
             how,
@@ -0,0 +1,26 @@
+import numpy
+
+
+def downsample_operations(operations, max_points_count):
+    # Keeps the rows with the min and the max sum of every time bucket plus
+    # the first and the last rows, so extremes and the endpoints of
+    # cumulative sums survive. Operations must be sorted by date
+    if operations is None or len(operations) <= max_points_count:
+        return operations
+    buckets_count = max(1, (max_points_count - 2) // 2)
+    dates = operations["operation_date"].to_numpy().view(numpy.int64)
+    span = float(dates[-1] - dates[0]) + 1
+    buckets = ((dates - dates[0]) / span * buckets_count).astype(numpy.int64)
+    sums = operations["operation_sum"].to_numpy()
+    # Rows sorted by bucket and then by sum, so the first row of a bucket
+    # holds its min and the last one holds its max
+    order = numpy.lexsort((sums, buckets))
+    ordered_buckets = buckets[order]
+    is_first = numpy.diff(ordered_buckets, prepend=-1) != 0
+    is_last = numpy.diff(ordered_buckets, append=buckets_count) != 0
+    rows = numpy.unique(
+        numpy.concatenate(
+            [order[is_first], order[is_last], [0, len(operations) - 1]]
+        )
+    )
+    return operations.take(rows)
@@ -14,10 +14,12 @@ class ViewElements:
         self._config = config
         self._localizer = None
         self._root = None
+        self._elements = None
 
     def setup_elements(self, localizer):
         self._localizer = localizer
         self._root = self._build_root(self._config["root"])
+        self._elements = self._build_elements_index(self._root)
 
     def get_default_source_data(self, name):
         if name not in self._default_source_data:
@@ -25,16 +27,27 @@ class ViewElements:
         return self._default_source_data[name]
 
     def __getitem__(self, name):
-        elements = list(self._root.select(dict(name=name)))
-        if len(elements) == 0:
+        if name not in self._elements:
             raise RuntimeError(
                 f"View object does not contain model with name {name}"
             )
-        if len(elements) != 1:
-            raise RuntimeError(
-                f"View object has more than one model with name {name}"
-            )
-        return elements[0]
+        return self._elements[name]
+
+    @classmethod
+    def _build_elements_index(cls, root):
+        # The layout doesn't change after it is built, so models are looked
+        # up by name once here instead of walking the tree on every access
+        elements = {}
+        for model in root.references():
+            if model.name is None:
+                continue
+            if model.name in elements:
+                raise RuntimeError(
+                    f"View object has more than one model with name "
+                    f"{model.name}"
+                )
+            elements[model.name] = model
+        return elements
 
     def _build_root(self, config):
         return bokeh.layouts.column(
@@ -109,6 +122,7 @@ class ViewElements:
             ),
             text="0",
             name="overview_tab_income_text",
+            currencies_name="overview_tab_income_currencies_text",
         )
 
     def _build_overview_spending_headline(self, config):
@@ -118,6 +132,7 @@ class ViewElements:
             ),
             text="0",
             name="overview_tab_spending_text",
+            currencies_name="overview_tab_spending_currencies_text",
         )
 
     def _build_overview_disposable_income_headline(self, config):
@@ -127,9 +142,10 @@ class ViewElements:
             ),
             text="0",
             name="overview_tab_disposable_income_text",
+            currencies_name="overview_tab_disposable_income_currencies_text",
         )
 
-    def _build_overview_headline(self, title, text, name):
+    def _build_overview_headline(self, title, text, name, currencies_name):
         return bokeh.layouts.row(
             bokeh.models.Div(
                 text=title,
@@ -142,6 +158,11 @@ class ViewElements:
                 # width_policy="max",
                 name=name,
             ),
+            bokeh.models.Div(
+                text="",
+                style={"font-size": "100%"},
+                name=currencies_name,
+            ),
             # width_policy="max",
         )
 
@@ -394,9 +415,15 @@ class ViewElements:
         days_option_title = self._localizer.get_literal(
             "transactions_tab_period_selector_days_option_title"
         )
+        weeks_option_title = self._localizer.get_literal(
+            "transactions_tab_period_selector_weeks_option_title"
+        )
         months_option_title = self._localizer.get_literal(
             "transactions_tab_period_selector_months_option_title"
         )
+        quarters_option_title = self._localizer.get_literal(
+            "transactions_tab_period_selector_quarters_option_title"
+        )
         years_option_title = self._localizer.get_literal(
             "transactions_tab_period_selector_years_option_title"
         )
@@ -408,7 +435,9 @@ class ViewElements:
             options=[
                 seconds_option_title,
                 days_option_title,
+                weeks_option_title,
                 months_option_title,
+                quarters_option_title,
                 years_option_title,
             ],
             name="transactions_tab_period_selector",
@@ -502,6 +531,22 @@ class ViewElements:
     def _build_operations_table_tab(self, config):
         return bokeh.models.Panel(
             child=bokeh.layouts.column(
+                bokeh.layouts.row(
+                    self._build_operations_table_sort_column_selector(
+                        config["sort_column_selector"],
+                        config["operations_table"]["columns"],
+                    ),
+                    self._build_operations_table_sort_order_selector(
+                        config["sort_order_selector"]
+                    ),
+                    self._build_operations_table_page_spinner(
+                        config["page_spinner"]
+                    ),
+                    self._build_operations_table_rows_text(
+                        config["rows_text"]
+                    ),
+                    name="operations_table_controls",
+                ),
                 self._build_operations_table(config["operations_table"]),
                 width_policy="max",
                 height_policy="max",
@@ -510,6 +555,52 @@ class ViewElements:
             name="operations_table_tab",
         )
 
+    def _build_operations_table_sort_column_selector(self, config, columns):
+        titles = [
+            self._localizer.get_literal(f"{info['name']}_field_title")
+            for info in columns
+        ]
+        return bokeh.models.Select(
+            title=self._localizer.get_literal(
+                "table_tab_sort_column_selector_title"
+            ),
+            value=self._localizer.get_literal(
+                f"{config['default']}_field_title"
+            ),
+            options=titles,
+            name="operations_table_sort_column_selector",
+        )
+
+    def _build_operations_table_sort_order_selector(self, config):
+        ascending_option_title = self._localizer.get_literal(
+            "table_tab_sort_order_selector_ascending_option_title"
+        )
+        descending_option_title = self._localizer.get_literal(
+            "table_tab_sort_order_selector_descending_option_title"
+        )
+        return bokeh.models.Select(
+            title=self._localizer.get_literal(
+                "table_tab_sort_order_selector_title"
+            ),
+            value=ascending_option_title,
+            options=[ascending_option_title, descending_option_title],
+            name="operations_table_sort_order_selector",
+        )
+
+    def _build_operations_table_page_spinner(self, config):
+        return bokeh.models.Spinner(
+            title=self._localizer.get_literal("table_tab_page_spinner_title"),
+            low=1,
+            high=1,
+            step=1,
+            value=1,
+            mode="int",
+            name="operations_table_page_spinner",
+        )
+
+    def _build_operations_table_rows_text(self, config):
+        return bokeh.models.Div(text="", name="operations_table_rows_text")
+
     def _build_operations_table(self, config):
         formatters = {
             "object": bokeh.models.widgets.StringFormatter(),
@@ -548,6 +639,9 @@ class ViewElements:
                 fields=[info["field"] for info in config["columns"]]
             ),
             columns=columns,
+            # Only a page of rows is on the client, so sorting is done by
+            # the server
+            sortable=False,
             width_policy="max",
             height_policy="max",
             name="operations_table",
@@ -0,0 +1,102 @@
+import logging
+
+import numpy
+import pandas
+
+logger = logging.getLogger(__name__)
+
+
+def _project_column(values):
+    # Dates are sent as float64 milliseconds since epoch like BokehJS keeps
+    # them, and numbers as float64 with NaN for missing values, so both go
+    # out as binary buffers
+    if pandas.api.types.is_datetime64_any_dtype(values.dtype):
+        dates = values.to_numpy(dtype="datetime64[ns]")
+        milliseconds = dates.view(numpy.int64) / 1e6
+        milliseconds[numpy.isnat(dates)] = numpy.nan
+        return milliseconds
+    elif pandas.api.types.is_bool_dtype(values.dtype):
+        return values.to_numpy(dtype=bool, na_value=False)
+    elif pandas.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype=numpy.float64, na_value=numpy.nan)
+    else:
+        return values.to_numpy(dtype=object, na_value=None)
+
+
+def project_columns(operations, column_names):
+    # Only the columns read by glyphs, tooltips and tables are sent
+    return {
+        column_name: _project_column(operations[column_name])
+        for column_name in column_names
+    }
+
+
+def _make_columns(data):
+    return {name: numpy.asarray(values) for name, values in data.items()}
+
+
+def _find_changed_rows(old_values, new_values):
+    # Missing values of both sides are equal. Bokeh compares patched object
+    # columns as a whole, which fails on pandas.NA, so those are not patched
+    old_missing = pandas.isna(old_values)
+    new_missing = pandas.isna(new_values)
+    if old_values.dtype.kind == "O" and (
+        old_missing.any() or new_missing.any()
+    ):
+        return None
+    same = old_missing & new_missing
+    present = ~(old_missing | new_missing)
+    same[present] = old_values[present] == new_values[present]
+    return numpy.flatnonzero(~same)
+
+
+def _make_delta(old_columns, new_columns):
+    # Patches of the rows both data have and rows to append, None when the
+    # data can not be reached from the old one that way
+    if old_columns.keys() != new_columns.keys():
+        return None
+    old_count = len(next(iter(old_columns.values()), []))
+    new_count = len(next(iter(new_columns.values()), []))
+    if new_count < old_count:
+        return None
+    patches = {}
+    for name, new_values in new_columns.items():
+        old_values = old_columns[name]
+        if old_values.dtype.kind != new_values.dtype.kind:
+            return None
+        rows = _find_changed_rows(old_values, new_values[:old_count])
+        if rows is None:
+            return None
+        elif len(rows) > 0:
+            patches[name] = list(zip(rows.tolist(), new_values[rows]))
+    appended = (
+        {name: values[old_count:] for name, values in new_columns.items()}
+        if new_count > old_count
+        else {}
+    )
+    return patches, appended, new_count - old_count
+
+
+def update_source_data(source, data, max_change_ratio):
+    # Sends only the changed cells and the appended rows of the data. Bokeh
+    # sends every column on assignment, so the delta is used while it stays
+    # below max_change_ratio of all the cells
+    new_columns = _make_columns(data)
+    delta = _make_delta(_make_columns(source.data), new_columns)
+    if delta is not None:
+        patches, appended, appended_count = delta
+        changed_count = sum(len(changes) for changes in patches.values())
+        changed_count += appended_count * len(new_columns)
+        new_count = len(next(iter(new_columns.values()), []))
+        cells_count = new_count * len(new_columns)
+        if changed_count <= max_change_ratio * cells_count:
+            if patches:
+                source.patch(patches)
+            if appended:
+                source.stream(appended)
+            logger.debug(
+                f"Updated {changed_count} of {cells_count} cells of "
+                f"{source.name}"
+            )
+            return
+    source.data = new_columns
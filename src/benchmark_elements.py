@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import logging
+import time
+
+import app.config
+import app.model.report
+import app.utils
+import app.view.app_view
+import app.view.elements
+import benchmark_report
+
+logger = logging.getLogger(__name__)
+
+
+class _IdleController:
+    # Stands in for the app controller, the benchmark never fires callbacks
+    def _ignore_change(self, attr, old, new):
+        del attr
+        del old
+        del new
+
+    def on_load_example_click(self):
+        pass
+
+    on_upload_files = _ignore_change
+    on_set_file_names = _ignore_change
+    on_tab_change = _ignore_change
+    on_transactions_tab_plot_settings_change = _ignore_change
+    on_transactions_range_change = _ignore_change
+    on_operations_table_sort_change = _ignore_change
+    on_operations_table_page_change = _ignore_change
+    on_control_change = _ignore_change
+
+
+def _walk_tree_getitem(self, name):
+    # Lookup as it was before the name index
+    elements = list(self._root.select(dict(name=name)))
+    if len(elements) == 0:
+        raise RuntimeError(
+            f"View object does not contain model with name {name}"
+        )
+    if len(elements) != 1:
+        raise RuntimeError(
+            f"View object has more than one model with name {name}"
+        )
+    return elements[0]
+
+
+@contextlib.contextmanager
+def _use_getitem(getitem):
+    original = app.view.elements.ViewElements.__getitem__
+    app.view.elements.ViewElements.__getitem__ = getitem
+    try:
+        yield
+    finally:
+        app.view.elements.ViewElements.__getitem__ = original
+
+
+def _make_reports(config, operations):
+    reporter = app.model.report.PandasOperationsReporter(config)
+    reporter.load(operations)
+    categories = list(operations["category"].unique())
+    settings = benchmark_report._make_settings(["days"])[0]
+    # Reports of two constraints, so refreshes alternate the shown data
+    reports = []
+    for constraints in [
+        None,
+        [
+            benchmark_report._make_constraint(
+                operations, categories=categories[: len(categories) // 2]
+            )
+        ],
+    ]:
+        reports.append(
+            {
+                name: getattr(reporter, f"report_{name}")(
+                    operations, constraints, settings
+                )
+                for name in [
+                    "overview",
+                    "transactions",
+                    "operations",
+                    "operations_stats",
+                ]
+            }
+        )
+    return reports
+
+
+def _refresh(view, reports, page_size):
+    # Control reads and view updates of the controller refreshing every tab
+    # and the controls after a load
+    view.get_date_range()
+    view.get_card_numbers()
+    view.get_categories()
+    view.get_descriptions()
+    view.get_data_files()
+    view.get_transactions_plot_mode()
+    view.get_transactions_period()
+    view.get_currency()
+    view.get_currencies()
+    view.get_operations_table_page()
+    view.get_operations_table_sort_column()
+    view.get_operations_table_sort_ascending()
+    view.update_controls_values(reports["operations_stats"])
+    overview = reports["overview"]
+    view.show_overview_income_text(overview["income_total"])
+    view.show_overview_spending_text(overview["spending_total"])
+    view.show_overview_disposable_income_text(
+        overview["disposable_income_total"]
+    )
+    view.show_overview_currencies_totals(overview["currencies_totals"])
+    view.show_overview_income(overview["income"].copy())
+    view.show_overview_spending(overview["spending"].copy())
+    view.show_overview_cards(overview["cards"].copy())
+    view.show_transactions(
+        income=reports["transactions"]["income"],
+        spending=reports["transactions"]["spending"],
+    )
+    view.show_operations_table(
+        operations=reports["operations"]["table"],
+        rows_count=reports["operations"]["rows_count"],
+        page=reports["operations"]["page"],
+        page_size=page_size,
+    )
+
+
+def _measure(view, reports, page_size, refreshes_count, lookups_count):
+    for index in range(2):
+        _refresh(view, reports[index % len(reports)], page_size)
+    start = time.perf_counter()
+    for index in range(refreshes_count):
+        _refresh(view, reports[index % len(reports)], page_size)
+    refresh_duration = (time.perf_counter() - start) / refreshes_count
+    names = [
+        model.name
+        for model in view.representation.references()
+        if model.name is not None
+    ]
+    start = time.perf_counter()
+    for index in range(lookups_count):
+        view._elements[names[index % len(names)]]
+    lookup_duration = (time.perf_counter() - start) / lookups_count
+    return refresh_duration, lookup_duration
+
+
+def _count_lookups(view, reports, page_size):
+    lookups_count = 0
+    getitem = app.view.elements.ViewElements.__getitem__
+
+    def count_lookup(self, name):
+        nonlocal lookups_count
+        lookups_count += 1
+        return getitem(self, name)
+
+    with _use_getitem(count_lookup):
+        _refresh(view, reports[0], page_size)
+    return lookups_count
+
+
+def _benchmark(args):
+    config = app.config.build_config()["handler"]
+    operations = benchmark_report._make_operations(args.rows, args.seed)
+    reports = _make_reports(config["model"]["report"], operations)
+    view = app.view.app_view.RevealAppView(config["view"])
+    view.setup(controller=_IdleController())
+    page_size = config["controller"]["operations_page_size"]
+    logger.info(
+        f"One refresh looks up "
+        f"{_count_lookups(view, reports, page_size)} elements"
+    )
+    for name, getitem in [
+        ("tree walk", _walk_tree_getitem),
+        ("name index", app.view.elements.ViewElements.__getitem__),
+    ]:
+        with _use_getitem(getitem):
+            refresh_duration, lookup_duration = _measure(
+                view, reports, page_size, args.refreshes, args.lookups
+            )
+        logger.info(
+            f"{name}: refresh {refresh_duration * 1e3:.1f} ms, "
+            f"lookup {lookup_duration * 1e6:.1f} us"
+        )
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare reveal app view refreshes with element lookups "
+        "walking the models tree and going through the name index"
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=10000,
+        help="Number of generated operations",
+    )
+    parser.add_argument(
+        "--refreshes", type=int, default=10, help="Number of timed refreshes"
+    )
+    parser.add_argument(
+        "--lookups", type=int, default=100, help="Number of timed lookups"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of generated operations"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    app.utils.init_logging()
+    _benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
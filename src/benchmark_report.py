@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+import argparse
+import logging
+import pathlib
+import time
+
+import numpy
+import pandas
+
+import app.model.duckdb_report
+import app.model.report
+import app.utils
+
+logger = logging.getLogger(__name__)
+
+
+def _read_report_config():
+    project_path = pathlib.Path(__file__).resolve().parent.parent
+    settings = app.utils.read_json(project_path / "config" / "settings.json")
+    return settings["handler"]["model"]["report"]
+
+
+def _build_reporter(backend, config):
+    if backend == "pandas":
+        return app.model.report.PandasOperationsReporter(config)
+    elif backend == "duckdb":
+        return app.model.duckdb_report.DuckdbOperationsReporter(config)
+    else:
+        raise RuntimeError(f"Unknown report backend {backend}")
+
+
+def _make_operations(rows_count, seed):
+    generator = numpy.random.default_rng(seed)
+    seconds = generator.integers(0, 5 * 365 * 86400, rows_count)
+    dates = numpy.datetime64("2018-01-01T00:00:00") + numpy.sort(
+        seconds
+    ).astype("timedelta64[s]")
+    totals = generator.normal(-500, 3000, rows_count).round(2)
+
+    def choose(values):
+        return pandas.Series(
+            generator.choice(values, rows_count), dtype="string"
+        )
+
+    def fill(value, dtype):
+        return pandas.Series(value, index=range(rows_count), dtype=dtype)
+
+    return pandas.DataFrame(
+        {
+            "operation_date": dates.astype("datetime64[ns]"),
+            "payment_date": dates.astype("datetime64[D]").astype(
+                "datetime64[ns]"
+            ),
+            "card_number": choose(["*1111", "*2222", "*3333", "*4444"]),
+            "status": choose(["OK"]),
+            "operation_total": totals,
+            "operation_currency": choose(["RUB"]),
+            "payment_total": totals,
+            "payment_currency": fill("RUB", "string"),
+            "cashback": fill(0.0, "float64"),
+            "category": choose([f"category {i}" for i in range(40)]),
+            "mcc_code": fill(5411, "Int64"),
+            "description": choose([f"description {i}" for i in range(2000)]),
+            "bonus": fill(0.0, "float64"),
+            "moneybox_rounding": fill(0.0, "float64"),
+            "operation_total_rounded": totals,
+            "data_file": choose(["2018.xls", "2019.xls", "2020.xls"]),
+            "operation_sum": totals,
+            # Lets the pandas backend answer reports from its cube
+            "operation_sum_RUB": totals,
+            "overview_sum_RUB": totals,
+        }
+    )
+
+
+def _make_constraint(operations, **values):
+    constraint = {
+        "date_range": (None, None),
+        "data_files": list(operations["data_file"].unique()),
+        "card_numbers": list(operations["card_number"].unique()),
+        "categories": list(operations["category"].unique()),
+        "descriptions": list(operations["description"].unique()),
+    }
+    constraint.update(values)
+    return constraint
+
+
+def _make_constraints(operations):
+    # Covers the cube and the masks paths of the pandas backend: dates at
+    # midnight and every description are answered by the cube, other dates
+    # and partial descriptions are not
+    categories = list(operations["category"].unique())
+    descriptions = list(operations["description"].unique())
+    return [
+        None,
+        [],
+        [_make_constraint(operations)],
+        [
+            _make_constraint(
+                operations,
+                date_range=("2019-01-01", "2021-06-30"),
+                card_numbers=["*1111", "*3333"],
+                categories=categories[: len(categories) // 2],
+            )
+        ],
+        [
+            _make_constraint(
+                operations,
+                date_range=("2019-01-01", "2020-06-30"),
+                card_numbers=["*1111"],
+            ),
+            _make_constraint(
+                operations,
+                date_range=("2020-01-01", None),
+                card_numbers=["*1111", "*2222"],
+                categories=categories[::3],
+            ),
+        ],
+        [
+            _make_constraint(operations, categories=[]),
+            _make_constraint(
+                operations, date_range=(None, "2019-01-01"), card_numbers=[]
+            ),
+        ],
+        [
+            _make_constraint(operations, card_numbers=None),
+            _make_constraint(
+                operations,
+                date_range=("2018-06-01", "2018-12-31"),
+                data_files=["2018.xls"],
+            ),
+        ],
+        [
+            _make_constraint(
+                operations,
+                date_range=("2019-03-01 12:00:00", "2019-09-01 06:30:00"),
+            )
+        ],
+        [
+            _make_constraint(
+                operations,
+                date_range=("2019-01-01", "2022-01-01"),
+                descriptions=descriptions[: len(descriptions) // 3],
+            ),
+            _make_constraint(
+                operations,
+                date_range=("2021-01-01", None),
+                categories=categories[:5],
+                descriptions=descriptions[::7],
+            ),
+        ],
+    ]
+
+
+def _make_settings(periods):
+    return [
+        {
+            "transactions_period": period,
+            "transactions_report_type": report_type,
+            "currency": "RUB",
+            "overview_currencies": ["RUB"],
+            "operations_page": 1,
+            "operations_page_size": 200,
+            "operations_sort_column": "category",
+            "operations_sort_ascending": False,
+        }
+        for period in periods
+        for report_type in ["incremental", "cumulative"]
+    ]
+
+
+def _compare_values(name, expected, actual):
+    if isinstance(expected, pandas.DataFrame):
+        pandas.testing.assert_frame_equal(
+            expected.reset_index(drop=True),
+            actual.reset_index(drop=True),
+            check_dtype=False,
+            check_names=False,
+            obj=name,
+        )
+    elif expected is None or actual is None:
+        if expected is not actual:
+            raise RuntimeError(f"Reports {name} differ")
+    elif isinstance(expected, (list, tuple)):
+        if list(expected) != list(actual):
+            raise RuntimeError(f"Reports {name} differ")
+    elif not numpy.isclose(expected, actual):
+        raise RuntimeError(f"Reports {name} differ")
+
+
+def _make_calls(constraints_list, settings_list):
+    # Only transactions depend on the period and the report type
+    for constraints in constraints_list:
+        for settings in settings_list:
+            yield "report_transactions", constraints, settings
+        for name in [
+            "report_overview",
+            "report_operations",
+            "report_operations_stats",
+        ]:
+            yield name, constraints, settings_list[0]
+
+
+def _benchmark(args):
+    config = _read_report_config()
+    settings_list = _make_settings(args.periods)
+    for rows_count in args.rows:
+        operations = _make_operations(rows_count, args.seed)
+        reporters = {}
+        durations = {}
+        for backend in args.backends:
+            reporters[backend] = _build_reporter(backend, config)
+            start = time.perf_counter()
+            reporters[backend].load(operations)
+            durations[backend] = {"load": time.perf_counter() - start}
+        calls = _make_calls(_make_constraints(operations), settings_list)
+        for name, constraints, settings in calls:
+            expected = None
+            for backend, reporter in reporters.items():
+                start = time.perf_counter()
+                report = getattr(reporter, name)(
+                    operations, constraints, settings
+                )
+                duration = time.perf_counter() - start
+                durations[backend][name] = (
+                    durations[backend].get(name, 0) + duration
+                )
+                if expected is None:
+                    expected = report
+                elif args.check:
+                    for key in expected:
+                        _compare_values(
+                            f"{name} {key}", expected[key], report[key]
+                        )
+        for backend, backend_durations in durations.items():
+            logger.info(
+                f"{backend} backend on {rows_count} rows: "
+                + ", ".join(
+                    f"{name} {duration:.3f}s"
+                    for name, duration in backend_durations.items()
+                )
+            )
+        if args.check:
+            logger.info(f"Reports of all backends on {rows_count} rows match")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare reports and timings of reveal app report backends"
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[10000, 1000000, 10000000],
+        help="Numbers of generated operations",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["pandas", "duckdb"],
+        help="Report backends, the first one is the reference",
+    )
+    parser.add_argument(
+        "--periods",
+        nargs="+",
+        default=["seconds", "days", "weeks", "months", "quarters", "years"],
+        help="Transactions periods",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of generated operations"
+    )
+    parser.add_argument(
+        "--no-check",
+        dest="check",
+        action="store_false",
+        help="Skip checking that all backends produce the same reports",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    app.utils.init_logging()
+    _benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import logging
+import sqlite3
+import threading
+
+import db.utils
+
+logger = logging.getLogger(__name__)
+
+
+class _KeeperCursor:
+    def __init__(self, connection, lock):
+        self._connection = connection
+        self._lock = lock
+        self._rows = []
+
+    def execute(self, command, parameters=()):
+        # Rows are fetched at once, so no statement stays open between calls
+        with self._lock:
+            self._rows = self._connection.execute(
+                command, parameters
+            ).fetchall()
+        return self
+
+    def executemany(self, command, parameters):
+        with self._lock:
+            self._connection.executemany(command, parameters)
+        self._rows = []
+        return self
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+
+class _KeeperConnection:
+    # Connections to a shared cache in-memory database lock tables of each
+    # other and fail with SQLITE_LOCKED instead of waiting, so all threads
+    # share the keeper connection and run statements one at a time
+    def __init__(self, connection, lock):
+        self._connection = connection
+        self._lock = lock
+
+    def cursor(self):
+        return _KeeperCursor(self._connection, self._lock)
+
+    def commit(self):
+        with self._lock:
+            self._connection.commit()
+
+    def close(self):
+        # The keeper is closed by the database
+        pass
+
+
+class InMemoryDatabase:
+    def __init__(self, db_path):
+        self._path = db_path
+        self._keeper = None
+        self._persisted_id = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        logger.info(f"Loading {self._path} into memory")
+        self._keeper = sqlite3.connect(":memory:", check_same_thread=False)
+        connection = db.utils.open_connection(self._path)
+        try:
+            connection.backup(self._keeper)
+        finally:
+            db.utils.close_connection(connection)
+        self._persisted_id = self._read_max_id(self._keeper)
+
+    def connect(self):
+        assert self._keeper is not None
+        return _KeeperConnection(self._keeper, self._lock)
+
+    def persist(self):
+        assert self._keeper is not None
+        with self._lock:
+            rows = self._keeper.execute(
+                self._get_read_command(), (self._persisted_id,)
+            ).fetchall()
+            if not rows:
+                return
+            logger.info(f"Persisting {len(rows)} new rates into {self._path}")
+            connection = db.utils.open_connection(self._path)
+            try:
+                connection.executemany(
+                    self._get_write_command(),
+                    ((date, symbol, rate) for _, date, symbol, rate in rows),
+                )
+                connection.commit()
+            finally:
+                db.utils.close_connection(connection)
+            self._persisted_id = rows[-1][0]
+
+    def close(self):
+        if self._keeper is not None:
+            self.persist()
+            with self._lock:
+                db.utils.close_connection(self._keeper)
+                self._keeper = None
+
+    @classmethod
+    def _read_max_id(cls, connection):
+        row = connection.execute("SELECT MAX(id) FROM usd_rates;").fetchone()
+        return row[0] if row[0] is not None else 0
+
+    @classmethod
+    def _get_read_command(cls):
+        return (
+            "SELECT id, date, symbol, rate FROM usd_rates "
+            "WHERE id > ? ORDER BY id;"
+        )
+
+    @classmethod
+    def _get_write_command(cls):
+        return (
+            "INSERT OR IGNORE INTO usd_rates(date, symbol, rate) "
+            "VALUES (?, ?, ?);"
+        )
+
+
+_databases = {}
+
+
+def load_database(db_path):
+    db_path = str(db_path)
+    if db_path not in _databases:
+        database = InMemoryDatabase(db_path)
+        database.load()
+        _databases[db_path] = database
+    return _databases[db_path]
+
+
+def find_database(db_path):
+    return _databases.get(str(db_path), None)
+
+
+def persist_databases():
+    for database in _databases.values():
+        try:
+            database.persist()
+        except Exception:
+            logger.exception("Failed to persist in-memory database")
+
+
+def close_databases():
+    while _databases:
+        _, database = _databases.popitem()
+        database.close()
@@ -0,0 +1,31 @@
+import logging
+import pathlib
+
+import db.utils
+
+logger = logging.getLogger(__name__)
+
+
+def _run_command(connection, command):
+    logger.info(f"Running command {command}")
+    connection.execute(command)
+    connection.commit()
+
+
+def optimize_database(db_path):
+    if not db.utils.is_database_exists(db_path):
+        raise RuntimeError(f"Database {db_path} doesn't exist")
+    size_before = pathlib.Path(db_path).stat().st_size
+    connection = db.utils.open_connection(db_path)
+    try:
+        _run_command(connection, "ANALYZE;")
+        # VACUUM can't run inside a transaction, so it goes after the commit
+        _run_command(connection, "VACUUM;")
+        _run_command(connection, "PRAGMA optimize;")
+    finally:
+        db.utils.close_connection(connection)
+    size_after = pathlib.Path(db_path).stat().st_size
+    logger.info(
+        f"Database {db_path} optimized: "
+        f"{size_before} bytes before, {size_after} bytes after"
+    )
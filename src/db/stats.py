@@ -0,0 +1,199 @@
+import json
+import logging
+import pathlib
+
+import db.utils
+
+logger = logging.getLogger(__name__)
+
+
+class _SqliteStatsReader(db.utils.DatabaseIO):
+    def __init__(self, db_path):
+        super().__init__(db_path)
+
+    def read_rows_count(self):
+        cursor = self._connection.cursor()
+        cursor.execute(self._get_rows_count_command())
+        return cursor.fetchone()[0]
+
+    def read_symbols_coverage(self):
+        cursor = self._connection.cursor()
+        cursor.execute(self._get_symbols_coverage_command())
+        return [
+            {
+                "symbol": symbol,
+                "rows_count": rows_count,
+                "begin_date": begin_date,
+                "end_date": end_date,
+                "days_count": days_count,
+                "missing_days_count": days_count - rows_count,
+            }
+            for symbol, rows_count, begin_date, end_date, days_count in cursor
+        ]
+
+    def read_symbols_gaps(self):
+        cursor = self._connection.cursor()
+        cursor.execute(self._get_symbols_gaps_command())
+        gaps = {}
+        for symbol, begin_date, end_date, days_count in cursor:
+            gaps.setdefault(symbol, []).append(
+                {
+                    "begin_date": begin_date,
+                    "end_date": end_date,
+                    "days_count": days_count,
+                }
+            )
+        return gaps
+
+    def read_dates_gaps(self):
+        cursor = self._connection.cursor()
+        cursor.execute(self._get_dates_gaps_command())
+        return [
+            {
+                "begin_date": begin_date,
+                "end_date": end_date,
+                "days_count": days_count,
+            }
+            for begin_date, end_date, days_count in cursor
+        ]
+
+    def read_pages(self):
+        cursor = self._connection.cursor()
+        pages = {}
+        for name in ["page_size", "page_count", "freelist_count"]:
+            cursor.execute(f"PRAGMA {name};")
+            pages[name] = cursor.fetchone()[0]
+        pages["used_page_count"] = (
+            pages["page_count"] - pages["freelist_count"]
+        )
+        pages["free_bytes"] = pages["freelist_count"] * pages["page_size"]
+        return pages
+
+    def read_indexes(self):
+        cursor = self._connection.cursor()
+        cursor.execute("PRAGMA index_list(usd_rates);")
+        names = [row[1] for row in cursor.fetchall()]
+        statistics = self._read_index_statistics(cursor)
+        indexes = []
+        for name in names:
+            cursor.execute(f"PRAGMA index_info({name});")
+            indexes.append(
+                {
+                    "name": name,
+                    "columns": [row[2] for row in cursor.fetchall()],
+                    "statistics": statistics.get(name, None),
+                }
+            )
+        return indexes
+
+    def read_lookup_plan(self):
+        cursor = self._connection.cursor()
+        cursor.execute(
+            "EXPLAIN QUERY PLAN " + self._get_lookup_command(),
+            ("1999-01-01", "USD"),
+        )
+        return [row[-1] for row in cursor.fetchall()]
+
+    @classmethod
+    def _read_index_statistics(cls, cursor):
+        cursor.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type='table' AND name='sqlite_stat1';"
+        )
+        if cursor.fetchone() is None:
+            return {}
+        cursor.execute(
+            "SELECT idx, stat FROM sqlite_stat1 WHERE tbl='usd_rates';"
+        )
+        return {idx: stat for idx, stat in cursor.fetchall()}
+
+    @classmethod
+    def _get_rows_count_command(cls):
+        return "SELECT COUNT(*) FROM usd_rates;"
+
+    @classmethod
+    def _get_symbols_coverage_command(cls):
+        return (
+            "SELECT symbol, COUNT(*), MIN(date), MAX(date), "
+            "CAST(julianday(MAX(date)) - julianday(MIN(date)) + 1 AS INTEGER) "
+            "FROM usd_rates GROUP BY symbol ORDER BY symbol;"
+        )
+
+    @classmethod
+    def _get_symbols_gaps_command(cls):
+        return """
+            SELECT
+                symbol,
+                date(previous_date, '+1 day'),
+                date(date, '-1 day'),
+                CAST(julianday(date) - julianday(previous_date) - 1 AS INTEGER)
+            FROM (
+                SELECT
+                    symbol,
+                    date,
+                    LAG(date) OVER (PARTITION BY symbol ORDER BY date)
+                        AS previous_date
+                FROM usd_rates
+            )
+            WHERE julianday(date) - julianday(previous_date) > 1
+            ORDER BY symbol, date;
+        """
+
+    @classmethod
+    def _get_dates_gaps_command(cls):
+        return """
+            SELECT
+                date(previous_date, '+1 day'),
+                date(date, '-1 day'),
+                CAST(julianday(date) - julianday(previous_date) - 1 AS INTEGER)
+            FROM (
+                SELECT date, LAG(date) OVER (ORDER BY date) AS previous_date
+                FROM (SELECT DISTINCT date FROM usd_rates)
+            )
+            WHERE julianday(date) - julianday(previous_date) > 1
+            ORDER BY date;
+        """
+
+    @classmethod
+    def _get_lookup_command(cls):
+        # Mirrors the lookup done by app.model.rates.DatabaseUsdRatesProxy
+        return "SELECT rate FROM usd_rates WHERE date=? AND symbol=?"
+
+
+def _build_stats_reader(db_path):
+    return _SqliteStatsReader(db_path)
+
+
+def _collect_stats_impl(reader, db_path):
+    pages = reader.read_pages()
+    symbols_gaps = reader.read_symbols_gaps()
+    symbols_coverage = reader.read_symbols_coverage()
+    for coverage in symbols_coverage:
+        coverage["gaps"] = symbols_gaps.get(coverage["symbol"], [])
+    return {
+        "path": str(db_path),
+        "file_size": pathlib.Path(db_path).stat().st_size,
+        "pages": pages,
+        "rows_count": reader.read_rows_count(),
+        "symbols_count": len(symbols_coverage),
+        "symbols": symbols_coverage,
+        "dates_gaps": reader.read_dates_gaps(),
+        "indexes": reader.read_indexes(),
+        "lookup_plan": reader.read_lookup_plan(),
+    }
+
+
+def collect_stats(db_path):
+    if not db.utils.is_database_exists(db_path):
+        raise RuntimeError(f"Database {db_path} doesn't exist")
+    with _build_stats_reader(db_path) as reader:
+        return _collect_stats_impl(reader, db_path)
+
+
+def report_stats(db_path):
+    logger.info(f"Collecting statistics of {db_path}")
+    stats = collect_stats(db_path)
+    if logger.isEnabledFor(logging.INFO):
+        stats_json = json.dumps(stats, indent=4, sort_keys=True)
+        logger.info(f"Database statistics:\n{stats_json}")
+    return stats
@@ -9,8 +9,10 @@ import os
 import db.create
 import db.delete
 import db.download
+import db.optimize
 import db.read
 import db.setup
+import db.stats
 
 
 def _create_db(args):
@@ -59,10 +61,19 @@ def _setup_db(args):
     return db.setup.setup_database(args.path, args.src)
 
 
+def _stats_db(args):
+    return db.stats.report_stats(args.path)
+
+
+def _optimize_db(args):
+    return db.optimize.optimize_database(args.path)
+
+
 def _parse_args():
     parser = argparse.ArgumentParser(
         description=(
-            "Create, delete, download, and setup data in reveal app databse"
+            "Create, delete, download, setup, inspect and optimize data in "
+            "reveal app databse"
         )
     )
     parser.add_argument(
@@ -184,6 +195,30 @@ def _parse_args():
     )
     parser_setup.set_defaults(func=_setup_db)
 
+    ############################################################################
+    # stats
+    ############################################################################
+
+    parser_stats = subparsers.add_parser(
+        "stats",
+        help=(
+            "Report rows count, dates coverage and gaps per symbol, "
+            "file and page sizes and index usage"
+        ),
+    )
+    parser_stats.add_argument("path", type=str, help="Path to the database")
+    parser_stats.set_defaults(func=_stats_db)
+
+    ############################################################################
+    # optimize
+    ############################################################################
+
+    parser_optimize = subparsers.add_parser(
+        "optimize", help="Run ANALYZE, VACUUM and PRAGMA optimize on database"
+    )
+    parser_optimize.add_argument("path", type=str, help="Path to the database")
+    parser_optimize.set_defaults(func=_optimize_db)
+
     return parser.parse_args()
 
 
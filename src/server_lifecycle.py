@@ -0,0 +1,29 @@
+import logging
+
+import app.config
+import app.model.rates
+import app.utils
+
+
+logger = logging.getLogger(__name__)
+
+
+def _get_rates_database_config():
+    conf = app.config.build_config()
+    return conf["handler"]["model"]["convert"]["rates"]["database"]
+
+
+def on_server_loaded(server_context):
+    app.utils.init_logging()
+    database_config = _get_rates_database_config()
+    app.model.rates.load_rates_database(database_config)
+    if database_config["in_memory"]:
+        server_context.add_periodic_callback(
+            lambda: app.model.rates.persist_rates_database(database_config),
+            database_config["persist_period"] * 1000,
+        )
+
+
+def on_server_unloaded(server_context):
+    del server_context
+    app.model.rates.unload_rates_database(_get_rates_database_config())
@@ -3,9 +3,11 @@ import bokeh.application.handlers.function
 import bokeh.server.server
 import json
 import logging
+import tornado.ioloop
 
 import app.config
 import app.handler
+import app.model.rates
 import app.utils
 
 
@@ -20,6 +22,8 @@ def main():
         "Application config:\n %s",
         json.dumps(conf, ensure_ascii=False, indent=4),
     )
+    database_config = conf["handler"]["model"]["convert"]["rates"]["database"]
+    app.model.rates.load_rates_database(database_config)
     handler = app.handler.RevealAppHandler(conf["handler"])
     application = bokeh.application.Application(
         bokeh.application.handlers.function.FunctionHandler(handler)
@@ -28,8 +32,16 @@ def main():
         applications={conf["server"]["app_route"]: application},
         allow_websocket_origin=conf["server"]["websocket_origin"],
     )
+    if database_config["in_memory"]:
+        tornado.ioloop.PeriodicCallback(
+            lambda: app.model.rates.persist_rates_database(database_config),
+            database_config["persist_period"] * 1000,
+        ).start()
     server_.start()
-    server_.io_loop.start()
+    try:
+        server_.io_loop.start()
+    finally:
+        app.model.rates.unload_rates_database(database_config)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,24 @@
+import numpy
+import pandas
+
+import app.model.index
+
+
+def test_column_index_counts_values():
+    index = app.model.index.ColumnIndex(
+        pandas.Series(["KFC", None, "Cinema", "KFC", "KFC", "Cinema"])
+    )
+    counts = index.count_values()
+    assert list(counts.index) == ["KFC", "Cinema"]
+    assert counts.tolist() == [3, 2]
+
+
+def test_column_index_counts_masked_values():
+    index = app.model.index.ColumnIndex(
+        pandas.Series(["KFC", None, "Cinema", "KFC", "KFC", "Cinema"])
+    )
+    mask = numpy.array([False, True, True, True, False, False])
+    counts = index.count_values(mask)
+    assert list(counts.index) == ["KFC", "Cinema"]
+    assert counts.tolist() == [1, 1]
+    assert index.get_unique_values(mask) == ["Cinema", "KFC"]
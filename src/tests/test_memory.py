@@ -0,0 +1,61 @@
+import datetime
+import threading
+
+import app.model.rates
+import db.create
+import db.memory
+
+
+def _use_rates(path, symbol, dates, errors):
+    try:
+        with app.model.rates.DatabaseUsdRatesProxy({"path": path}) as proxy:
+            for date in dates:
+                bids = [(date, symbol)]
+                proxy.set_rates(bids, [1.5])
+                assert proxy.get_rates(bids) == [1.5]
+    except Exception as error:
+        errors.append(error)
+
+
+def _persist(path, stop, errors):
+    try:
+        while not stop.is_set():
+            db.memory.find_database(path).persist()
+    except Exception as error:
+        errors.append(error)
+
+
+def test_in_memory_database_is_shared_by_threads(tmp_path):
+    path = str(tmp_path / "rates.db")
+    db.create.create_database(path)
+    db.memory.load_database(path)
+    dates = [
+        str(datetime.date(2020, 1, 1) + datetime.timedelta(days=days))
+        for days in range(300)
+    ]
+    errors = []
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=_use_rates,
+            args=(path, symbol, dates, errors),
+        )
+        for symbol in ["EUR", "RUB"]
+    ]
+    persister = threading.Thread(target=_persist, args=(path, stop, errors))
+    try:
+        persister.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stop.set()
+        persister.join()
+    finally:
+        db.memory.close_databases()
+    assert errors == []
+    with app.model.rates.DatabaseUsdRatesProxy({"path": path}) as proxy:
+        assert proxy.get_rates([(dates[0], "EUR"), (dates[-1], "RUB")]) == [
+            1.5,
+            1.5,
+        ]